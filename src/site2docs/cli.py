@@ -21,6 +21,12 @@ def _parse_expand_texts(raw: str | None) -> Iterable[str]:
 
 
 def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
+    return _build_parser().parse_args(list(argv) if argv is not None else None)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """コマンドライン引数のパーサーを構築します。"""
+
     parser = argparse.ArgumentParser(description="アーカイブ済みサイトから静的ドキュメントを生成します")
     parser.add_argument("--input", dest="input_dir", type=Path, required=True, help="HTML ファイルを含むディレクトリへのパス")
     parser.add_argument("--out", dest="output_dir", type=Path, required=True, help="生成成果物を書き出すディレクトリ")
@@ -46,6 +52,12 @@ def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
         action="store_true",
         help="Playwright で再試行しても失敗したページを最終手段としてローカルHTMLのまま処理する",
     )
+    parser.add_argument(
+        "--dedupe-identical-html",
+        dest="deduplicate_identical_files",
+        action="store_true",
+        help="同じディレクトリ内で内容が同一の HTML を 1 度だけレンダリングし、結果を使い回す",
+    )
 
     extraction_group = parser.add_argument_group("抽出設定")
     extraction_group.add_argument(
@@ -166,7 +178,7 @@ def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
         default=None,
         help="クラスタラベル検証で使用する最小トークン長",
     )
-    return parser.parse_args(list(argv) if argv is not None else None)
+    return parser
 
 
 def main(argv: Iterable[str] | None = None) -> None:
@@ -189,6 +201,7 @@ def main(argv: Iterable[str] | None = None) -> None:
         expand_texts=_parse_expand_texts(args.expand_texts),
         max_concurrency=args.render_concurrency,
         allow_render_fallback=args.allow_render_fallback,
+        deduplicate_identical_files=args.deduplicate_identical_files,
         launch_options=launch_options,
         extraction_overrides=extraction_overrides,
         graph_overrides=graph_overrides,
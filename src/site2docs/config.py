@@ -34,6 +34,7 @@ def default_timestamp() -> datetime:
 class RenderConfig:
     """コンテンツ抽出前に適用するレンダリング設定。"""
 
+    # スクロールごとに遅延読み込みを待つ時間の上限 (秒)。読み込みが落ち着けば早めに次へ進む
     scroll_pause: float = 0.2
     max_scroll_iterations: int = 20
     expand_texts: Sequence[str] = (
@@ -70,7 +71,16 @@ class RenderConfig:
     file_scheme_wait_until: str = "domcontentloaded"
     post_render_delay: float = 0.2
     allow_plain_fallback: bool = False
+    # Playwright が使えず全ページをそのまま読む場合に、文字コード判定をプロセスプールで並列化する
+    plain_read_processes: bool = False
     launch_options: Mapping[str, Any] | None = None
+    # browser.new_context() に渡す追加オプション。既定値 (Service Worker 無効化など) を上書きできる
+    context_options: Mapping[str, Any] | None = None
+    # 同じコンテキストで処理するページ数の上限。超えたら作り直して Chromium のメモリ増加を抑える
+    pages_per_context: int = 50
+    # 同じディレクトリにある内容が同一の HTML は 1 度だけレンダリングし、結果を使い回す。
+    # location.pathname やファイル名で分岐するスクリプトがあると結果が変わり得るため、既定では無効
+    deduplicate_identical_files: bool = False
 
 
 @dataclass(slots=True)
@@ -87,6 +97,8 @@ class ExtractionConfig:
     semantic_length_ratio: float = 1.25
     semantic_min_delta: int = 100
     max_workers: int | None = None
+    # True の場合は markdownify ではなく、lxml ベースの高速な簡易変換を使う
+    fast_markdown: bool = False
 
 
 @dataclass(slots=True)
@@ -166,6 +178,7 @@ class BuildConfig:
         expand_texts: Optional[Iterable[str]] = None,
         max_concurrency: Optional[int] = None,
         allow_render_fallback: bool = False,
+        deduplicate_identical_files: bool = False,
         launch_options: Mapping[str, Any] | None = None,
         extraction_overrides: Mapping[str, Any] | None = None,
         graph_overrides: Mapping[str, Any] | None = None,
@@ -183,6 +196,8 @@ class BuildConfig:
             render_kwargs["max_concurrency"] = max(1, max_concurrency)
         if allow_render_fallback:
             render_kwargs["allow_plain_fallback"] = True
+        if deduplicate_identical_files:
+            render_kwargs["deduplicate_identical_files"] = True
         if launch_options:
             render_kwargs["launch_options"] = dict(launch_options)
         render_config = RenderConfig(**render_kwargs)
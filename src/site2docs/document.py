@@ -4,12 +4,13 @@ from __future__ import annotations
 
 from datetime import datetime
 from pathlib import Path
-from typing import Sequence
+from typing import Mapping, Sequence
 
 from .extraction import ExtractedPage
 from .graphing import Cluster
 
 ISO_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+CITATION_DATE_FORMAT = "%Y-%m-%d %Z"
 
 
 class MissingClusterPageError(ValueError):
@@ -23,15 +24,49 @@ class MissingClusterPageError(ValueError):
         super().__init__(message)
 
 
-def build_markdown(cluster: Cluster, pages: Sequence[ExtractedPage], created_at: datetime) -> str:
-    """クラスタに対応する Markdown ドキュメントを組み立てます。"""
+def build_markdown(
+    cluster: Cluster,
+    pages: Sequence[ExtractedPage],
+    created_at: datetime,
+    *,
+    page_lookup: Mapping[str, ExtractedPage] | None = None,
+) -> str:
+    """クラスタに対応する Markdown ドキュメントを組み立てます。
+
+    複数クラスタで同じページ集合を扱う場合は、`page_lookup` に索引済みの
+    マッピングを渡すと再構築を省略できます。
+    """
+
+    ordered_pages = _order_cluster_pages(cluster, pages, page_lookup)
+
+    # 出典 URL・目次・本文セクションを 1 回の走査でまとめて組み立てる
+    source_urls: list[str] = []
+    toc_lines: list[str] = []
+    section_lines: list[str] = []
+    # 同一瞬間でもタイムゾーンが異なれば表記が変わるため tzinfo もキーに含める
+    captured_labels: dict[tuple[datetime, object], str] = {}
+    for page in ordered_pages:
+        if page.url:
+            source_urls.append(page.url)
+        toc_lines.extend(f"- {heading}" for heading in page.headings)
+        captured_key = (page.captured_at, page.captured_at.tzinfo)
+        captured_label = captured_labels.get(captured_key)
+        if captured_label is None:
+            captured_label = page.captured_at.strftime(CITATION_DATE_FORMAT)
+            captured_labels[captured_key] = captured_label
+        file_path = page.file_path.as_posix()
+        section_lines.extend(
+            (
+                f"## {page.title or page.page_id}",
+                f"> 出典URL: {page.url or file_path}",
+                f"> ファイルパス: {file_path}",
+                f"> 取得日時: {captured_label}",
+                "",
+                page.markdown.strip(),
+                "",
+            )
+        )
 
-    page_lookup = {page.page_id: page for page in pages}
-    missing_page_ids = [pid for pid in cluster.page_ids if pid not in page_lookup]
-    if missing_page_ids:
-        raise MissingClusterPageError(cluster.cluster_id, missing_page_ids)
-    ordered_pages = [page_lookup[pid] for pid in cluster.page_ids]
-    source_urls = [page.url for page in ordered_pages if page.url]
     cluster_identifier = cluster.slug or cluster.cluster_id
     frontmatter_lines = [
         "---",
@@ -56,31 +91,38 @@ def build_markdown(cluster: Cluster, pages: Sequence[ExtractedPage], created_at:
         body.extend(summary_lines)
         body.append("")
 
-    if any(page.headings for page in ordered_pages):
+    if toc_lines:
         body.append("## 目次")
-        for page in ordered_pages:
-            for heading in page.headings:
-                body.append(f"- {heading}")
+        body.extend(toc_lines)
         body.append("")
 
-    for page in ordered_pages:
-        body.append(f"## {page.title or page.page_id}")
-        citation_lines = [
-            f"> 出典URL: {page.url or page.file_path.as_posix()}",
-            f"> ファイルパス: {page.file_path.as_posix()}",
-            f"> 取得日時: {page.captured_at.strftime('%Y-%m-%d %Z')}",
-        ]
-        body.extend(citation_lines)
-        body.append("")
-        body.append(page.markdown.strip())
-        body.append("")
+    body.extend(section_lines)
 
     return "\n".join(frontmatter_lines + body)
 
 
+def _order_cluster_pages(
+    cluster: Cluster,
+    pages: Sequence[ExtractedPage],
+    page_lookup: Mapping[str, ExtractedPage] | None,
+) -> list[ExtractedPage]:
+    # 呼び出し元で既にクラスタ順へ並べ替え済みであれば索引を作らずにそのまま使う
+    if page_lookup is None and len(pages) == len(cluster.page_ids) and all(
+        page.page_id == pid for page, pid in zip(pages, cluster.page_ids)
+    ):
+        return list(pages)
+    if page_lookup is None:
+        page_lookup = {page.page_id: page for page in pages}
+    missing_page_ids = [pid for pid in cluster.page_ids if pid not in page_lookup]
+    if missing_page_ids:
+        raise MissingClusterPageError(cluster.cluster_id, missing_page_ids)
+    return [page_lookup[pid] for pid in cluster.page_ids]
+
+
 def write_markdown(path: Path, content: str) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content, encoding="utf-8")
+    # 全文がメモリ上に揃っているため、テキストラッパーを介さずに一括で書き込む
+    path.write_bytes(content.encode("utf-8"))
 
 
 def _build_summary(pages: Sequence[ExtractedPage]) -> list[str]:
@@ -91,8 +133,15 @@ def _build_summary(pages: Sequence[ExtractedPage]) -> list[str]:
 
 
 def _first_significant_line(markdown: str) -> str:
-    for raw_line in markdown.splitlines():
-        line = raw_line.strip()
+    # 最初の該当行だけが必要なため、splitlines() で全行を展開せずに走査する
+    start = 0
+    size = len(markdown)
+    while start < size:
+        end = markdown.find("\n", start)
+        if end == -1:
+            end = size
+        line = markdown[start:end].strip()
+        start = end + 1
         if not line or line.startswith("#"):
             continue
         if len(line) > 120:
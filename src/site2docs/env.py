@@ -4,8 +4,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import os
+import re
 from pathlib import Path
-from typing import Iterable, Mapping
+from typing import Iterable, Iterator, Mapping
 
 DEFAULT_ENV_NAME = ".env"
 LLM_API_KEY_ENV = "SITE2DOCS_API_KEY"
@@ -13,6 +14,11 @@ OPENAI_API_KEY_ENV = "OPENAI_API_KEY"
 LLM_MODEL_ENV = "SITE2DOCS_MODEL"
 OPENAI_MODEL_ENV = "OPENAI_MODEL"
 
+# `KEY=value` 形式の 1 行を解析する。値の外側を囲む同種の引用符は取り除く。
+_ENV_LINE = re.compile(r"""([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(?:"(.*)"|'(.*)'|(.*?))""")
+
+_ENV_CACHE: dict[Path, tuple[int, dict[str, str]]] = {}
+
 
 @dataclass(slots=True)
 class LLMSettings:
@@ -26,24 +32,22 @@ def load_env_file(path: str | Path | None = None) -> dict[str, str]:
     """`.env` ファイルを読み込み、未設定の環境変数を補完します。"""
 
     env_path = _locate_env_file(path)
-    if env_path is None or not env_path.exists():
+    if env_path is None:
         return {}
-    loaded: dict[str, str] = {}
-    for raw_line in env_path.read_text(encoding="utf-8").splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith("#"):
-            continue
-        if "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        key = key.strip()
-        if not key:
-            continue
-        value = _strip_quotes(value.strip())
-        if key not in os.environ:
-            os.environ[key] = value
-        loaded[key] = value
-    return loaded
+    try:
+        stat = env_path.stat()
+    except OSError:
+        return {}
+    cache_key = env_path.resolve()
+    cached = _ENV_CACHE.get(cache_key)
+    if cached is not None and cached[0] == stat.st_mtime_ns:
+        loaded = cached[1]
+    else:
+        loaded = _parse_env_bytes(env_path.read_bytes())
+        _ENV_CACHE[cache_key] = (stat.st_mtime_ns, loaded)
+    for key, value in loaded.items():
+        os.environ.setdefault(key, value)
+    return dict(loaded)
 
 
 def current_llm_settings(source: Mapping[str, str] | None = None) -> LLMSettings:
@@ -71,9 +75,29 @@ def _locate_env_file(path: str | Path | None) -> Path | None:
     return None
 
 
-def _strip_quotes(value: str) -> str:
-    if not value:
-        return value
-    if len(value) >= 2 and value[0] == value[-1] and value[0] in {'"', "'"}:
-        return value[1:-1]
-    return value
+def _parse_env_bytes(data: bytes) -> dict[str, str]:
+    loaded: dict[str, str] = {}
+    for raw_line in _iter_lines(data):
+        stripped = raw_line.strip()
+        # コメント・空行・代入を含まない行はデコード前に読み飛ばす
+        if not stripped or stripped[:1] == b"#" or b"=" not in stripped:
+            continue
+        match = _ENV_LINE.fullmatch(stripped.decode("utf-8").strip())
+        if match is None:
+            continue
+        key, double_quoted, single_quoted, bare = match.groups()
+        loaded[key] = next(
+            (value for value in (double_quoted, single_quoted, bare) if value is not None), ""
+        )
+    return loaded
+
+
+def _iter_lines(data: bytes) -> Iterator[bytes]:
+    start = 0
+    size = len(data)
+    while start < size:
+        end = data.find(b"\n", start)
+        if end == -1:
+            end = size
+        yield data[start:end]
+        start = end + 1
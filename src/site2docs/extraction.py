@@ -2,21 +2,34 @@
 
 from __future__ import annotations
 
+import copy
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from html import unescape
-from html.parser import HTMLParser
 import logging
+import re
+import threading
 from pathlib import Path
-from typing import Iterable
-from urllib.parse import urljoin, urldefrag, urlparse
+from typing import Callable, Iterable, Iterator
+from urllib.parse import DefragResult, ParseResult, urljoin, urldefrag, urlparse
+
+import lxml.html as lxml_html
+from lxml import etree
 
 from .config import ExtractionConfig
 
+try:  # pragma: no cover - optional dependency
+    from trafilatura.readability_lxml import Document as TrafilaturaReadability  # type: ignore
+except Exception:  # pragma: no cover
+    TrafilaturaReadability = None  # type: ignore[misc]
+
 try:  # pragma: no cover - optional dependency
     from readability import Document  # type: ignore
+    from readability.htmls import shorten_title  # type: ignore
 except Exception:  # pragma: no cover
     Document = None  # type: ignore[misc]
+    shorten_title = None  # type: ignore[misc]
 
 try:  # pragma: no cover - optional dependency
     import trafilatura  # type: ignore
@@ -24,17 +37,53 @@ except Exception:  # pragma: no cover
     trafilatura = None  # type: ignore[misc]
 
 try:  # pragma: no cover - optional dependency
-    from markdownify import markdownify as html_to_markdown  # type: ignore
+    from selectolax.lexbor import LexborHTMLParser  # type: ignore
 except Exception:  # pragma: no cover
-    html_to_markdown = None  # type: ignore[misc]
+    LexborHTMLParser = None  # type: ignore[misc]
 
 try:  # pragma: no cover - optional dependency
-    from bs4 import BeautifulSoup  # type: ignore
+    from markdownify import markdownify as html_to_markdown  # type: ignore
 except Exception:  # pragma: no cover
-    BeautifulSoup = None  # type: ignore[misc]
+    html_to_markdown = None  # type: ignore[misc]
+
+
+_SKIPPED_LINK_PREFIXES = ("javascript:", "mailto:", "tel:")
+_NON_TEXT_TAGS = frozenset({"script", "style", "template"})
+
+# 木の走査は C 実装の XPath に任せ、Python 側のループを最小化する
+_XP_HEADINGS = etree.XPath("descendant-or-self::*[self::h1 or self::h2 or self::h3]")
+_XP_ANCHORS = etree.XPath("descendant-or-self::a[@href]")
+_XP_TITLE = etree.XPath("normalize-space(//title)")
+_XP_MAIN = etree.XPath("descendant-or-self::main")
+_XP_ROLE_MAIN = etree.XPath("descendant-or-self::*[contains(translate(@role, 'MAIN', 'main'), 'main')]")
+_XP_ARTICLES = etree.XPath("descendant-or-self::article")
+
+_NOISE_TAGS = ("header", "nav", "footer", "aside", "form")
+_NOISE_ROLE_KEYWORDS = ("banner", "navigation", "contentinfo", "complementary")
+_NOISE_ATTRIBUTE_KEYWORDS = ("breadcrumb", "nav", "menu", "global", "footer", "sns", "social", "share", "cta")
+
 
+def _build_noise_xpath() -> etree.XPath:
+    def matches_any(attribute: str, keywords: Iterable[str]) -> str:
+        # キーワードごとの contains() を並べず、1 本の正規表現で大文字小文字を無視して照合する
+        pattern = "|".join(re.escape(keyword) for keyword in keywords)
+        return f"re:test(@{attribute}, '{pattern}', 'i')"
 
-@dataclass(slots=True)
+    conditions = [f"self::{tag}" for tag in _NOISE_TAGS]
+    conditions.append(matches_any("role", _NOISE_ROLE_KEYWORDS))
+    conditions.append(matches_any("class", _NOISE_ATTRIBUTE_KEYWORDS))
+    conditions.append(matches_any("id", _NOISE_ATTRIBUTE_KEYWORDS))
+    return etree.XPath(
+        f"descendant::*[{' or '.join(conditions)}]",
+        namespaces={"re": "http://exslt.org/regular-expressions"},
+    )
+
+
+# ナビゲーション等のノイズ要素をタグ名・role・class・id から 1 回の走査で拾う
+_XP_NOISE = _build_noise_xpath()
+
+
+@dataclass(frozen=True, slots=True)
 class ExtractedPage:
     """HTML ページを正規化した表現。"""
 
@@ -43,33 +92,370 @@ class ExtractedPage:
     file_path: Path
     title: str
     markdown: str
-    headings: list[str]
-    links: list[str]
+    headings: tuple[str, ...]
+    links: tuple[str, ...]
     captured_at: datetime
 
 
-class _FallbackAnchorParser(HTMLParser):
-    """BeautifulSoup が利用できない場合の簡易リンクパーサー。"""
+_ReadableStrategy = Callable[[str, lxml_html.HtmlElement | None, list[str]], tuple[str, str] | None]
+
+
+def _iter_visible_text(node: lxml_html.HtmlElement) -> Iterator[str]:
+    """script/style/template を除いたテキスト断片を文書順に返します。"""
+
+    if node.tag in _NON_TEXT_TAGS:
+        return
+    if node.text:
+        yield node.text
+    for child in node:
+        if isinstance(child.tag, str):
+            yield from _iter_visible_text(child)
+        if child.tail:
+            yield child.tail
+
+
+def _visible_text(node: lxml_html.HtmlElement, separator: str = "", strip: bool = False) -> str:
+    """BeautifulSoup の `get_text` 相当の文字列を lxml 要素から組み立てます。"""
+
+    segments: Iterable[str] = _iter_visible_text(node)
+    if strip:
+        segments = [segment.strip() for segment in segments]
+        return separator.join(segment for segment in segments if segment)
+    return separator.join(segments)
+
+
+_TEXT_BLOCK_TAGS = frozenset({"section", "div"})
+
+
+def _longest_text_block(root: lxml_html.HtmlElement) -> lxml_html.HtmlElement | None:
+    """可視テキストが最も長い section/div を 1 回の走査で求めます。
+
+    各要素の文字数は子要素の集計値を積み上げて求めるため、候補ごとに
+    部分木のテキストを組み立て直す必要がありません。長さは
+    `_visible_text(node, " ", strip=True)` と同じ値になります。
+    """
+
+    best_node = None
+    best_length = 0
+    best_order = -1
+    order = 0
+    # 要素ごとの [空白除去後の文字数, 空でない断片数, 文書内の出現順]
+    stack: list[list[int]] = []
+    walker = etree.iterwalk(root, events=("start", "end"))
+    for event, node in walker:
+        if event == "start":
+            stack.append([0, 0, order])
+            order += 1
+            if not isinstance(node.tag, str) or node.tag in _NON_TEXT_TAGS:
+                walker.skip_subtree()
+                continue
+            text = node.text.strip() if node.text else ""
+            if text:
+                stack[-1][0] += len(text)
+                stack[-1][1] += 1
+            continue
+        chars, segments, node_order = stack.pop()
+        if segments and node.tag in _TEXT_BLOCK_TAGS:
+            length = chars + segments - 1
+            # 同じ長さなら文書順で先に現れる要素 (祖先側) を優先する
+            if length > best_length or (length == best_length and node_order < best_order):
+                best_node, best_length, best_order = node, length, node_order
+        if not stack:
+            break
+        parent = stack[-1]
+        parent[0] += chars
+        parent[1] += segments
+        tail = node.tail.strip() if node.tail else ""
+        if tail:
+            parent[0] += len(tail)
+            parent[1] += 1
+    return best_node
+
+
+# 同一サイト内では基底 URL や href が繰り返し現れるため、URL 解析結果を共有する
+@lru_cache(maxsize=8192)
+def _cached_urlparse(url: str) -> ParseResult:
+    return urlparse(url)
+
+
+@lru_cache(maxsize=8192)
+def _cached_urljoin(base_url: str, href: str) -> str:
+    return urljoin(base_url, href)
+
+
+@lru_cache(maxsize=8192)
+def _cached_urldefrag(url: str) -> DefragResult:
+    return urldefrag(url)
+
+
+_HTML_SUFFIXES = (".html", ".htm", ".php", ".asp", ".aspx", ".jsp")
+_SITE_BACKUP = "site_backup"
+
+
+def _looks_like_host(segment: str) -> bool:
+    return "." in segment and not segment.lower().endswith(_HTML_SUFFIXES)
+
+
+@lru_cache(maxsize=4096)
+def _host_from_path_parts(parts: tuple[str, ...]) -> str:
+    """アーカイブのディレクトリ構成要素からホスト名らしきディレクトリ名を推定します。"""
+
+    host = ""
+    try:
+        start = parts.index(_SITE_BACKUP)
+    except ValueError:
+        start = -1
+    search_range = parts[start + 1 :] if start >= 0 else parts
+    for segment in search_range:
+        if _looks_like_host(segment):
+            host = segment
+    return host
+
+
+_MD_HEADING_LEVELS = {f"h{level}": level for level in range(1, 7)}
+_MD_BLOCK_TAGS = frozenset(
+    {
+        "address",
+        "article",
+        "aside",
+        "dd",
+        "details",
+        "div",
+        "dl",
+        "dt",
+        "figcaption",
+        "figure",
+        "footer",
+        "header",
+        "main",
+        "nav",
+        "p",
+        "section",
+        "summary",
+        "table",
+    }
+)
+_MD_INLINE_MARKERS = {"strong": "**", "b": "**", "em": "*", "i": "*", "code": "`"}
+_MD_SKIPPED_TAGS = _NON_TEXT_TAGS | {"head", "noscript"}
+_MD_WHITESPACE = re.compile(r"\s+")
+# markdownify の既定と同様に、本文中の強調記号はエスケープして書式と区別する
+_MD_ESCAPED_CHARS = re.compile(r"([*_])")
+
+
+class _MarkdownWriter:
+    """lxml の iterwalk イベントから Markdown を組み立てる簡易ステートマシン。"""
 
     def __init__(self) -> None:
-        super().__init__()
-        self._links: list[str] = []
+        self._blocks: list[tuple[str, bool, tuple[int, ...]]] = []
+        self._inline: list[str] = []
+        self._prefix = ""
+        self._item = False
+        self._lists: list[list[int]] = []
+        self._tables: list[list[int]] = []
+        # 開いている強調タグごとの、中身が始まる `_inline` 上の位置
+        self._marks: list[int] = []
+        self._code_depth = 0
+        # 開いている blockquote の通し番号。隣り合う別々の引用を区別するために使う
+        self._quotes: tuple[int, ...] = ()
+        self._quote_count = 0
+
+    def render(self, root: lxml_html.HtmlElement) -> str:
+        walker = etree.iterwalk(root, events=("start", "end"))
+        for event, element in walker:
+            tag = element.tag
+            if event == "start":
+                if not isinstance(tag, str) or tag in _MD_SKIPPED_TAGS:
+                    # skip_subtree しても end イベントは届くため、tail はそちらで拾う
+                    walker.skip_subtree()
+                    continue
+                if self._start(element, tag):
+                    walker.skip_subtree()
+                    continue
+                if element.text:
+                    self._append_text(element.text)
+            else:
+                if isinstance(tag, str) and tag not in _MD_SKIPPED_TAGS:
+                    self._end(element, tag)
+                if element.tail and element is not root:
+                    self._append_text(element.tail)
+        self._flush()
+        parts: list[str] = []
+        previous_item = False
+        previous_quotes: tuple[int, ...] = ()
+        for text, item, quotes in self._blocks:
+            if not text:
+                previous_item = False
+                continue
+            if parts:
+                if item and previous_item:
+                    parts.append("\n")
+                else:
+                    # 同じ引用の中で続くブロックは、空行にも引用記号を付けて 1 つの引用に保つ
+                    shared = 0
+                    for current, previous in zip(quotes, previous_quotes):
+                        if current != previous:
+                            break
+                        shared += 1
+                    parts.append(f"\n{' '.join('>' * shared)}\n" if shared else "\n\n")
+            parts.append(text)
+            previous_item = item
+            previous_quotes = quotes
+        return "".join(parts)
+
+    def _append_text(self, text: str) -> None:
+        text = _MD_WHITESPACE.sub(" ", text)
+        if not self._code_depth:
+            text = _MD_ESCAPED_CHARS.sub(r"\\\1", text)
+        self._inline.append(text)
+
+    def _start(self, element: lxml_html.HtmlElement, tag: str) -> bool:
+        """開始タグを処理し、子孫の走査を省略すべき場合は True を返します。"""
+
+        level = _MD_HEADING_LEVELS.get(tag)
+        if level is not None:
+            self._flush()
+            self._prefix = "#" * level + " "
+        elif tag == "blockquote":
+            self._flush()
+            self._quote_count += 1
+            self._quotes += (self._quote_count,)
+        elif tag in _MD_BLOCK_TAGS:
+            self._flush()
+            if tag == "table":
+                self._tables.append([0, 0])
+        elif tag in ("ul", "ol"):
+            self._flush()
+            self._lists.append([1 if tag == "ol" else 0])
+        elif tag == "li":
+            self._flush()
+            depth = max(len(self._lists) - 1, 0)
+            marker = "- "
+            if self._lists and self._lists[-1][0]:
+                marker = f"{self._lists[-1][0]}. "
+                self._lists[-1][0] += 1
+            self._prefix = "  " * depth + marker
+            self._item = True
+        elif tag == "tr":
+            self._flush()
+            self._prefix = "| "
+            self._item = True
+            if self._tables:
+                self._tables[-1][1] = 0
+        elif tag in ("td", "th"):
+            if self._tables:
+                if self._tables[-1][1]:
+                    self._inline.append(" | ")
+                self._tables[-1][1] += 1
+        elif tag == "pre":
+            self._flush()
+            code = _visible_text(element).strip("\n")
+            if code:
+                self._emit(f"```\n{code}\n```")
+            return True
+        elif tag == "br":
+            self._inline.append("\n")
+        elif tag == "hr":
+            self._flush()
+            self._emit("---")
+        elif tag == "img":
+            src = element.get("src")
+            if src:
+                self._inline.append(f"![{element.get('alt', '').strip()}]({src})")
+        elif tag == "a":
+            if element.get("href"):
+                self._inline.append("[")
+        elif tag in _MD_INLINE_MARKERS:
+            self._marks.append(len(self._inline))
+            if tag == "code":
+                self._code_depth += 1
+        return False
+
+    def _end(self, element: lxml_html.HtmlElement, tag: str) -> None:
+        if tag == "blockquote":
+            self._flush()
+            self._quotes = self._quotes[:-1]
+            self._close_group()
+        elif tag in _MD_HEADING_LEVELS or tag in _MD_BLOCK_TAGS or tag == "li":
+            self._flush()
+            if tag == "table" and self._tables:
+                self._tables.pop()
+                self._close_group()
+        elif tag in ("ul", "ol"):
+            self._flush()
+            if self._lists:
+                self._lists.pop()
+            if not self._lists:
+                self._close_group()
+        elif tag == "tr":
+            self._inline.append(" |")
+            self._flush()
+            if self._tables:
+                state = self._tables[-1]
+                state[0] += 1
+                if state[0] == 1 and state[1]:
+                    self._emit("|" + " --- |" * state[1], True)
+        elif tag == "a":
+            href = element.get("href")
+            if href:
+                self._inline.append(f"]({href})")
+        elif tag in _MD_INLINE_MARKERS:
+            if tag == "code":
+                self._code_depth -= 1
+            self._wrap_inline(_MD_INLINE_MARKERS[tag])
+
+    def _wrap_inline(self, marker: str) -> None:
+        """直近に開いた強調タグの中身を記号で囲みます。
+
+        markdownify と同様に前後の空白は記号の外側へ出し、`** bold **` のような
+        Markdown として解釈されない出力を避けます。
+        """
+
+        start = self._marks.pop()
+        inner = "".join(self._inline[start:])
+        del self._inline[start:]
+        stripped = inner.strip()
+        if not stripped:
+            self._inline.append(inner)
+            return
+        leading = " " if inner[0].isspace() else ""
+        trailing = " " if inner[-1].isspace() else ""
+        self._inline.append(f"{leading}{marker}{stripped}{marker}{trailing}")
+
+    def _close_group(self) -> None:
+        """リストや表の終端で、後続ブロックとの間に空行が入るよう印を付けます。"""
 
-    @property
-    def links(self) -> list[str]:
-        return self._links
+        self._blocks.append(("", False, ()))
 
-    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
-        if tag.lower() != "a":
+    def _emit(self, text: str, item: bool = False) -> None:
+        """ブロックを確定し、引用の内側であれば各行へ引用記号を付けます。"""
+
+        if self._quotes:
+            marker = "> " * len(self._quotes)
+            text = "\n".join(marker + line for line in text.split("\n"))
+        self._blocks.append((text, item, self._quotes))
+
+    def _flush(self) -> None:
+        """溜まったインライン断片を空白を畳んだ 1 ブロックとして確定します。"""
+
+        if not self._inline:
             return
-        href = ""
-        for name, value in attrs:
-            if name.lower() == "href":
-                href = (value or "").strip()
-                break
-        if not href or href.startswith(("javascript:", "mailto:", "tel:")):
+        raw = "".join(self._inline)
+        self._inline.clear()
+        # 強調タグの途中でブロックが切れた場合、残りの中身だけを囲む
+        self._marks = [0] * len(self._marks)
+        lines = (" ".join(line.split()) for line in raw.split("\n"))
+        text = "\n".join(line for line in lines if line)
+        if not text or text == "|":
             return
-        self._links.append(href)
+        self._emit(self._prefix + text, self._item)
+        self._prefix = ""
+        self._item = False
+
+
+def _html_to_markdown_lxml(tree: lxml_html.HtmlElement) -> str:
+    """lxml の要素木を文書順に 1 回走査して Markdown へ変換します。"""
+
+    return _MarkdownWriter().render(tree)
 
 
 class ContentExtractor:
@@ -79,12 +465,19 @@ class ContentExtractor:
         self._config = config
         self._logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self._warn_missing_dependencies()
+        # 利用可能な抽出器を優先順に確定させ、ページごとの分岐判定を省く
+        self._readable_strategies = self._build_readable_strategies()
+        # libxml2 のパーサーや直近の計測結果はスレッド間で共有できないため、スレッドごとに保持する
+        self._thread_state = threading.local()
 
     def extract(self, page_id: str, html: str, *, url: str, file_path: Path, captured_at: datetime) -> ExtractedPage:
-        canonical_url = self._infer_canonical_url(html, url, file_path)
-        title, content_html = self._extract_readable(html)
+        # ページ全体の HTML は一度だけ解析し、正規 URL・リンク・本文補完で木を共有する。
+        # 本文補完は木を直接書き換えるため、読み取りだけの処理を先に済ませておく
+        tree = self._parse_html(html)
+        canonical_url = self._infer_canonical_url(tree, url, file_path)
+        links = self._extract_links(html, canonical_url, tree)
+        title, content_html = self._extract_readable(html, tree)
         headings = self._extract_headings(content_html)
-        links = self._extract_links(html, canonical_url)
         markdown = self._convert_to_markdown(content_html)
         return ExtractedPage(
             page_id=page_id,
@@ -99,98 +492,205 @@ class ContentExtractor:
 
     # Internal helpers -------------------------------------------------
 
-    def _extract_readable(self, html: str) -> tuple[str, str]:
-        semantic_cache: tuple[str, str] | None = None
+    def _html_parser(self) -> lxml_html.HTMLParser:
+        parser = getattr(self._thread_state, "parser", None)
+        if parser is None:
+            # コメントと処理命令は解析時に捨て、以降の走査対象を減らす
+            parser = lxml_html.HTMLParser(
+                recover=True,
+                remove_comments=True,
+                remove_pis=True,
+                huge_tree=True,
+            )
+            self._thread_state.parser = parser
+        return parser
+
+    def _parse_html(self, html: str) -> lxml_html.HtmlElement | None:
+        if not html or not html.strip():
+            return None
+        parser = self._html_parser()
+        try:
+            return lxml_html.document_fromstring(html, parser=parser)
+        except ValueError:
+            # XML 宣言付きの文字列は lxml が受け付けないため bytes で再解析する
+            try:
+                return lxml_html.document_fromstring(html.encode("utf-8"), parser=parser)
+            except (ValueError, etree.ParserError):
+                return None
+        except etree.ParserError:
+            return None
+
+    def _extract_readable(self, html: str, tree: lxml_html.HtmlElement | None = None) -> tuple[str, str]:
         extractor_errors: list[str] = []
 
-        def maybe_upgrade(title: str, content_html: str) -> tuple[str, str]:
-            nonlocal semantic_cache
-            if not self._config.semantic_body_fallback or BeautifulSoup is None:
+        def maybe_upgrade(title: str, content_html: str, content_len: int | None = None) -> tuple[str, str]:
+            if not self._config.semantic_body_fallback or tree is None:
                 return title, content_html
-            if semantic_cache is None:
-                semantic_cache = self._extract_semantic_body(html)
-            semantic_title, semantic_html = semantic_cache
-            if not semantic_html:
+            semantic_title, candidate, semantic_html = self._extract_semantic_body(tree)
+            if candidate is None or not semantic_html:
                 return title, content_html
-            if self._should_use_semantic(content_html, semantic_html):
+            # 候補要素から直接文字数を数え、シリアライズ済み HTML の再解析を避ける
+            semantic_len = len(_visible_text(candidate, " ", strip=True))
+            if content_len is None:
+                content_len = self._count_plain_text(content_html)
+            if self._should_use_semantic(content_len, semantic_len):
                 return title or semantic_title, semantic_html
             return title, content_html
 
-        if self._config.readability and Document is not None:
-            try:
-                doc = Document(html)
-                title = unescape(doc.short_title())
-                summary_html = doc.summary(html_partial=True)
-                if self._has_enough_content(summary_html):
-                    return maybe_upgrade(title, summary_html)
-            except Exception as exc:
-                extractor_errors.append(f"readability: {exc}")
-                self._logger.debug("Readability での抽出に失敗しました。", exc_info=exc)
-        if self._config.trafilatura and trafilatura is not None:
-            try:
-                extracted = trafilatura.extract(html, include_comments=False, include_tables=True, favor_recall=True)
-                if extracted and self._has_enough_content(extracted):
-                    return maybe_upgrade("", extracted)
-            except Exception as exc:
-                extractor_errors.append(f"trafilatura: {exc}")
-                self._logger.debug("Trafilatura での抽出に失敗しました。", exc_info=exc)
+        body = None
+        body_len = 0
+        strategies = self._readable_strategies
+        if tree is not None:
+            body = tree.find("body")
+            if body is None:
+                body = tree
+            body_len = len(_visible_text(body, " ", strip=True))
+            threshold = self._config.min_content_characters
+            if threshold > 0 and body_len < threshold:
+                # ページ全体でも閾値に届かない場合はどの抽出器の結果も採用されないため呼び出さない
+                strategies = ()
+        for strategy in strategies:
+            extracted = strategy(html, tree, extractor_errors)
+            if extracted is not None:
+                return maybe_upgrade(*extracted)
         if not self._config.fallback_plain_text:
             details = f" 詳細: {'; '.join(extractor_errors)}" if extractor_errors else ""
             raise RuntimeError(
                 "読み取り可能な本文抽出に失敗しました。ExtractionConfig.fallback_plain_text を True に設定すると"
                 " プレーンテキストへのフォールバックを有効化できます。" + details
             )
-        if BeautifulSoup is None:
-            return "", html
-        soup = BeautifulSoup(html, "lxml") if BeautifulSoup is not None else None
-        if soup is None:
+        if tree is None or body is None:
             return "", html
-        title = soup.title.string.strip() if soup.title and soup.title.string else ""
-        main = soup.body or soup
-        return maybe_upgrade(title, str(main))
-
-    def _extract_headings(self, content_html: str) -> list[str]:
-        if BeautifulSoup is None or not self._config.preserve_headings:
-            return []
-        soup = BeautifulSoup(content_html, "lxml")
+        title = self._document_title(tree)
+        return maybe_upgrade(
+            title,
+            lxml_html.tostring(body, encoding="unicode", with_tail=False),
+            body_len,
+        )
+
+    def _build_readable_strategies(self) -> list[_ReadableStrategy]:
+        strategies: list[_ReadableStrategy] = []
+        if self._config.readability and (TrafilaturaReadability is not None or Document is not None):
+            strategies.append(self._extract_with_readability)
+        if self._config.trafilatura and trafilatura is not None:
+            strategies.append(self._extract_with_trafilatura)
+        return strategies
+
+    def _extract_with_readability(
+        self, html: str, tree: lxml_html.HtmlElement | None, errors: list[str]
+    ) -> tuple[str, str] | None:
+        try:
+            if TrafilaturaReadability is not None and tree is not None:
+                # 解析済みの木を渡して再パースを避ける。summary は木を破壊するため複製を渡す
+                title = shorten_title(tree) if shorten_title is not None else self._document_title(tree)
+                summary_html = TrafilaturaReadability(copy.deepcopy(tree)).summary()
+            else:
+                doc = Document(html)
+                title = doc.short_title()
+                summary_html = doc.summary(html_partial=True)
+            if "&" in title:
+                # 通常は lxml がデコード済みのため、二重エスケープされた場合のみ復元する
+                title = unescape(title)
+            if self._has_enough_content(summary_html):
+                return title, summary_html
+        except Exception as exc:
+            errors.append(f"readability: {exc}")
+            self._logger.debug("Readability での抽出に失敗しました。", exc_info=exc)
+        return None
+
+    def _extract_with_trafilatura(
+        self, html: str, tree: lxml_html.HtmlElement | None, errors: list[str]
+    ) -> tuple[str, str] | None:
+        try:
+            extracted = trafilatura.extract(html, include_comments=False, include_tables=True, favor_recall=True)
+            if extracted and self._has_enough_content(extracted):
+                return "", extracted
+        except Exception as exc:
+            errors.append(f"trafilatura: {exc}")
+            self._logger.debug("Trafilatura での抽出に失敗しました。", exc_info=exc)
+        return None
+
+    def _extract_headings(self, content_html: str) -> tuple[str, ...]:
+        if not self._config.preserve_headings:
+            return ()
+        if LexborHTMLParser is not None:
+            try:
+                return self._extract_headings_lexbor(content_html)
+            except Exception as exc:
+                self._logger.debug("selectolax での見出し抽出に失敗しました。", exc_info=exc)
+        tree = self._parse_html(content_html)
+        if tree is None:
+            return ()
+        headings: list[str] = []
+        for node in _XP_HEADINGS(tree):
+            text = _visible_text(node, strip=True)
+            if text:
+                headings.append(text)
+        return tuple(headings)
+
+    def _extract_headings_lexbor(self, content_html: str) -> tuple[str, ...]:
+        # 見出しだけが必要なため、lxml より軽量な lexbor で断片を解析する
+        tree = LexborHTMLParser(content_html)
         headings: list[str] = []
-        for level in ("h1", "h2", "h3"):
-            for node in soup.find_all(level):
-                text = node.get_text(strip=True)
-                if text:
-                    headings.append(text)
-        return headings
-
-    def _extract_links(self, html: str, base_url: str) -> list[str]:
-        if BeautifulSoup is None:
-            parser = _FallbackAnchorParser()
-            parser.feed(html)
-            candidates = parser.links
-        else:
-            soup = BeautifulSoup(html, "lxml")
-            candidates = [(tag.get("href") or "").strip() for tag in soup.find_all("a")]
-        links: set[str] = set()
+        for node in tree.css("h1, h2, h3"):
+            for hidden in node.css(", ".join(_NON_TEXT_TAGS)):
+                hidden.decompose()
+            text = node.text(deep=True, separator="", strip=True)
+            if text:
+                headings.append(text)
+        return tuple(headings)
+
+    def _extract_links(self, html: str, base_url: str, tree: lxml_html.HtmlElement | None = None) -> tuple[str, ...]:
+        if tree is None:
+            tree = self._parse_html(html)
+        if tree is None:
+            return ()
+        candidates = (node.get("href").strip() for node in _XP_ANCHORS(tree))
+        # 出現順を保ったまま重複を除去する (下流は順序に依存しないためソートしない)。
+        # 同じ href は同じ URL に解決されるため、解決前の文字列で重複を弾く。
+        links: dict[str, None] = {}
+        seen_hrefs: set[str] = set()
+        base = _cached_urlparse(base_url)
+        origin = f"{base.scheme}://{base.netloc}" if base.scheme in ("http", "https") and base.netloc else ""
         for href in candidates:
-            if not href or href.startswith(("javascript:", "mailto:", "tel:")):
+            if not href or href in seen_hrefs or href.startswith(_SKIPPED_LINK_PREFIXES):
                 continue
-            resolved = self._resolve_link(href, base_url)
-            if resolved:
-                links.add(resolved)
-        return sorted(links)
+            seen_hrefs.add(href)
+            if href.startswith("#"):
+                # ページ内アンカーは base_url 自身に解決されるため常に除外される
+                continue
+            if href.startswith(("http://", "https://")):
+                absolute = href
+            elif origin and href.startswith("/") and not href.startswith("//") and "/." not in href:
+                absolute = origin + href
+            else:
+                # 相対パスやドットセグメントを含む場合のみ urljoin で正規化する
+                absolute = _cached_urljoin(base_url, href)
+            normalized = absolute.partition("#")[0]
+            if normalized.endswith("?"):
+                # urldefrag と同様に空のクエリ区切りは残さない
+                normalized = normalized[:-1]
+            if normalized and normalized != base_url:
+                links[normalized] = None
+        return tuple(links)
 
     def _convert_to_markdown(self, content_html: str) -> str:
-        if html_to_markdown is not None:
+        if not self._config.fast_markdown and html_to_markdown is not None:
             try:
                 return html_to_markdown(content_html, strip="")
             except Exception as exc:
                 self._logger.debug("markdownify での変換に失敗しました。", exc_info=exc)
-        if BeautifulSoup is None:
+        tree = self._parse_html(content_html)
+        if tree is None:
             return content_html
-        soup = BeautifulSoup(content_html, "lxml")
-        return soup.get_text("\n")
+        try:
+            return _html_to_markdown_lxml(tree)
+        except Exception as exc:  # pragma: no cover - 想定外の木構造への保険
+            self._logger.debug("lxml による Markdown 変換に失敗しました。", exc_info=exc)
+            return _visible_text(tree, "\n")
 
     def _warn_missing_dependencies(self) -> None:
-        if self._config.readability and Document is None:
+        if self._config.readability and TrafilaturaReadability is None and Document is None:
             self._logger.warning(
                 "readability パッケージが存在しないため、Readability による本文抽出をスキップします。"
             )
@@ -198,21 +698,9 @@ class ContentExtractor:
             self._logger.warning(
                 "Trafilatura が利用できないため、セマンティック抽出の第2候補が無効化されます。"
             )
-        if html_to_markdown is None:
+        if not self._config.fast_markdown and html_to_markdown is None:
             self._logger.warning(
-                "markdownify が利用できないため、Markdown 生成はプレーンテキストへのフォールバックを使用します。"
-            )
-        if BeautifulSoup is None:
-            impacted: list[str] = []
-            if self._config.preserve_headings:
-                impacted.append("見出し抽出")
-            if self._config.semantic_body_fallback:
-                impacted.append("セマンティック本文補完")
-            impacted.append("リンク正規化")
-            details = "、".join(impacted)
-            self._logger.warning(
-                "BeautifulSoup が利用できないため、%s がプレーンテキストベースの処理にフォールバックします。",
-                details,
+                "markdownify が利用できないため、Markdown 生成は lxml ベースの簡易変換を使用します。"
             )
 
     def _has_enough_content(self, content: str) -> bool:
@@ -224,17 +712,21 @@ class ContentExtractor:
     def _count_plain_text(self, content: str) -> int:
         if not content:
             return 0
-        if BeautifulSoup is None:
+        if "<" not in content:
+            # Trafilatura の出力などタグを含まない文字列は解析せずに数える
             return len(content.strip())
-        soup = BeautifulSoup(content, "lxml")
-        text = soup.get_text(" ", strip=True)
-        return len(text)
-
-    def _should_use_semantic(self, current_html: str, semantic_html: str) -> bool:
-        focus_len = self._count_plain_text(semantic_html)
+        # 閾値判定と本文補完の比較で同じ文字列を数えるため、直近の結果を再利用する
+        memo = getattr(self._thread_state, "text_length", None)
+        if memo is not None and memo[0] is content:
+            return memo[1]
+        tree = self._parse_html(content)
+        length = len(content.strip()) if tree is None else len(_visible_text(tree, " ", strip=True))
+        self._thread_state.text_length = (content, length)
+        return length
+
+    def _should_use_semantic(self, current_len: int, focus_len: int) -> bool:
         if focus_len <= 0:
             return False
-        current_len = self._count_plain_text(current_html)
         if current_len <= 0:
             return focus_len >= max(self._config.semantic_min_length, self._config.min_content_characters)
         if focus_len <= current_len:
@@ -246,91 +738,50 @@ class ContentExtractor:
             return True
         return False
 
-    def _extract_semantic_body(self, html: str) -> tuple[str, str]:
-        if BeautifulSoup is None:
-            return "", ""
-        soup = BeautifulSoup(html, "lxml")
-        if soup is None:
-            return "", ""
-        title = soup.title.string.strip() if soup.title and soup.title.string else ""
-        body = soup.body
+    def _extract_semantic_body(
+        self, tree: lxml_html.HtmlElement
+    ) -> tuple[str, lxml_html.HtmlElement | None, str]:
+        """ノイズ除去後の本文候補を返します。`tree` はその場で書き換えられます。"""
+
+        title = self._document_title(tree)
+        body = tree.find("body")
         if body is None:
-            return title, ""
-        body_clone = BeautifulSoup(str(body), "lxml")
-        if body_clone is None:
-            return title, ""
-        self._strip_semantic_noise(body_clone)
-        candidate = self._select_semantic_candidate(body_clone)
+            return title, None, ""
+        # 抽出の最終段でのみ呼ばれるため、複製せずにノイズを除去する
+        self._strip_semantic_noise(body)
+        candidate = self._select_semantic_candidate(body)
         if candidate is None:
-            return title, ""
-        return title, str(candidate)
-
-    def _select_semantic_candidate(self, soup: "BeautifulSoup") -> "BeautifulSoup":  # type: ignore[name-defined]
-        if soup is None:
-            return soup
-        preferred = soup.find("main")
-        if preferred and preferred.get_text(strip=True):
-            return preferred
-        role_main = soup.find(attrs={"role": lambda value: isinstance(value, str) and "main" in value.lower()})
-        if role_main and role_main.get_text(strip=True):
-            return role_main
-        articles = soup.find_all("article")
+            return title, None, ""
+        return title, candidate, lxml_html.tostring(candidate, encoding="unicode", with_tail=False)
+
+    def _document_title(self, tree: lxml_html.HtmlElement) -> str:
+        # 空白の正規化まで XPath 側で済ませ、None 判定や strip を省く
+        return str(_XP_TITLE(tree))
+
+    def _select_semantic_candidate(self, root: lxml_html.HtmlElement) -> lxml_html.HtmlElement:
+        for query in (_XP_MAIN, _XP_ROLE_MAIN):
+            matches = query(root)
+            if matches and _visible_text(matches[0], strip=True):
+                return matches[0]
+        articles = _XP_ARTICLES(root)
         if articles:
-            articles.sort(key=lambda node: len(node.get_text(" ", strip=True)), reverse=True)
-            if articles[0].get_text(strip=True):
+            articles.sort(key=lambda node: len(_visible_text(node, " ", strip=True)), reverse=True)
+            if _visible_text(articles[0], strip=True):
                 return articles[0]
-        best_node = None
-        best_length = 0
-        for node in soup.find_all(["section", "div"], limit=2000):
-            text = node.get_text(" ", strip=True)
-            if not text:
-                continue
-            length = len(text)
-            if length > best_length:
-                best_node = node
-                best_length = length
-        return best_node or soup
-
-    def _strip_semantic_noise(self, node: "BeautifulSoup") -> None:  # type: ignore[name-defined]
-        if BeautifulSoup is None or node is None:
-            return
-        removable_tags = ("header", "nav", "footer", "aside", "form")
-        for tag in list(node.find_all(removable_tags)):
-            tag.decompose()
-        for tag in list(node.find_all(attrs={"role": True})):
-            try:
-                role = str(tag.get("role", "") or "").lower()  # type: ignore[union-attr]
-            except AttributeError:
-                continue
-            if any(keyword in role for keyword in ("banner", "navigation", "contentinfo", "complementary")):
-                tag.decompose()
-        keywords = ("breadcrumb", "nav", "menu", "global", "footer", "sns", "social", "share", "cta")
-        for tag in list(node.find_all(attrs={"class": True})):
-            try:
-                classes_attr = tag.get("class") or []  # type: ignore[union-attr]
-            except AttributeError:
-                continue
-            if isinstance(classes_attr, str):
-                classes = classes_attr
-            else:
-                classes = " ".join(classes_attr)
-            classes = classes.lower()
-            if any(keyword in classes for keyword in keywords):
-                tag.decompose()
-        for tag in list(node.find_all(attrs={"id": True})):
-            try:
-                ident = str(tag.get("id", "") or "").lower()  # type: ignore[union-attr]
-            except AttributeError:
-                continue
-            if any(keyword in ident for keyword in keywords):
-                tag.decompose()
+        best_node = _longest_text_block(root)
+        return best_node if best_node is not None else root
+
+    def _strip_semantic_noise(self, root: lxml_html.HtmlElement) -> None:
+        # 祖先が先に除去済みでも drop_tree は安全に動くため、一致要素をそのまま順に落とす
+        for node in _XP_NOISE(root):
+            node.drop_tree()
 
-    def _infer_canonical_url(self, html: str, url: str, file_path: Path) -> str:
+    def _infer_canonical_url(self, tree: lxml_html.HtmlElement | None, url: str, file_path: Path) -> str:
         sanitized = self._sanitize_url(url)
         if sanitized.startswith(("http://", "https://")):
             return sanitized
         host = self._extract_host_from_path(file_path)
-        html_url = self._canonical_url_from_html(html, host)
+        html_url = self._canonical_url_from_html(tree, host)
         if html_url:
             return html_url
         path_url = self._build_url_from_archive_path(file_path, host)
@@ -341,7 +792,7 @@ class ContentExtractor:
     def _sanitize_url(self, url: str | None) -> str:
         if not url:
             return ""
-        normalized, _ = urldefrag(url)
+        normalized, _ = _cached_urldefrag(url)
         return normalized
 
     def _extract_host_from_path(self, file_path: Path) -> str:
@@ -349,23 +800,26 @@ class ContentExtractor:
             parts = file_path.parts
         except Exception:
             return ""
-        host = ""
-        try:
-            start = parts.index("site_backup")
-        except ValueError:
-            start = -1
-        search_range = parts[start + 1 :] if start >= 0 else parts
-        for segment in search_range:
-            lowered = segment.lower()
-            if "." in segment and not lowered.endswith((".html", ".htm", ".php", ".asp", ".aspx", ".jsp")):
-                host = segment
-        return host
-
-    def _canonical_url_from_html(self, html: str, host: str) -> str:
-        if BeautifulSoup is None:
+        if not parts:
+            return ""
+        # 同じディレクトリのページは大量にあるため、ファイル名を除いた部分でキャッシュを引く
+        name = parts[-1]
+        if _looks_like_host(name):
+            return name
+        if name == _SITE_BACKUP:
+            return ""
+        return _host_from_path_parts(parts[:-1])
+
+    def _canonical_url_from_html(self, tree: lxml_html.HtmlElement | None, host: str) -> str:
+        if tree is None:
             return ""
-        soup = BeautifulSoup(html, "lxml")
-        href = self._extract_canonical_link(soup) or self._extract_meta_url(soup)
+        href = ""
+        head = tree.find("head")
+        # 正規 URL は通常 <head> にあるため、まず head だけを走査し、無い場合のみ文書全体を探す
+        for scope in (head, tree) if head is not None else (tree,):
+            href = self._extract_canonical_link(scope) or self._extract_meta_url(scope)
+            if href:
+                break
         href = href.strip() if href else ""
         if not href:
             return ""
@@ -378,21 +832,24 @@ class ContentExtractor:
             return f"https://{host}{sanitized}"
         return f"https://{host}/{sanitized.lstrip('/')}"
 
-    def _extract_canonical_link(self, soup: "BeautifulSoup") -> str:
-        for link in soup.find_all("link"):
-            rel = link.get("rel")
-            rels = [rel] if isinstance(rel, str) else rel or []
-            rels_lower = [str(value).strip().lower() for value in rels]
-            if "canonical" in rels_lower:
+    def _extract_canonical_link(self, tree: lxml_html.HtmlElement) -> str:
+        for link in tree.iter("link"):
+            rels = (link.get("rel") or "").lower().split()
+            if "canonical" in rels:
                 href = link.get("href")
                 if href:
                     return href
         return ""
 
-    def _extract_meta_url(self, soup: "BeautifulSoup") -> str:
-        meta = soup.find("meta", attrs={"property": "og:url"}) or soup.find("meta", attrs={"name": "twitter:url"})
-        if meta and meta.get("content"):
-            return str(meta.get("content"))
+    def _extract_meta_url(self, tree: lxml_html.HtmlElement) -> str:
+        twitter_url = None
+        for node in tree.iter("meta"):
+            if node.get("property") == "og:url":
+                return str(node.get("content") or "")
+            if twitter_url is None and node.get("name") == "twitter:url":
+                twitter_url = node
+        if twitter_url is not None and twitter_url.get("content"):
+            return str(twitter_url.get("content"))
         return ""
 
     def _build_url_from_archive_path(self, file_path: Path, host: str) -> str:
@@ -411,13 +868,6 @@ class ContentExtractor:
             return f"https://{host}/"
         return self._sanitize_url(f"https://{host}/{path.lstrip('/')}")
 
-    def _resolve_link(self, href: str, base_url: str) -> str:
-        absolute = urljoin(base_url, href)
-        normalized, _ = urldefrag(absolute)
-        if not normalized or normalized == base_url:
-            return ""
-        return normalized
-
 
 def extract_contents(
     pages: Iterable[ExtractedPage],
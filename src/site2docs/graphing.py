@@ -3,27 +3,52 @@
 from __future__ import annotations
 
 import logging
+from array import array
 from collections import defaultdict
 from dataclasses import dataclass
+from functools import lru_cache
+from os.path import commonprefix
 from pathlib import Path
 import re
-from typing import Any, Sequence
-from urllib.parse import urlparse
+from typing import Any, Mapping, Sequence
 
 from .config import GraphConfig
 from .extraction import ExtractedPage
 
-try:  # pragma: no cover - optional dependency
-    import networkx as nx  # type: ignore
-    from networkx.algorithms.community import greedy_modularity_communities  # type: ignore
-except Exception:  # pragma: no cover
-    nx = None  # type: ignore[misc]
-    greedy_modularity_communities = None  # type: ignore[misc]
 
-try:  # pragma: no cover - optional dependency
-    from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
-except Exception:  # pragma: no cover
-    TfidfVectorizer = None  # type: ignore[misc]
+# networkx / igraph / scikit-learn は読み込みに時間がかかるため、初めて必要になった時点で読み込む
+@lru_cache(maxsize=None)
+def _load_igraph() -> Any | None:
+    try:  # pragma: no cover - optional dependency
+        import igraph  # type: ignore
+    except Exception:  # pragma: no cover
+        return None
+    return igraph
+
+
+@lru_cache(maxsize=None)
+def _load_networkx() -> tuple[Any, Any] | None:
+    """`(networkx, greedy_modularity_communities)` を返します。"""
+
+    try:  # pragma: no cover - optional dependency
+        import networkx as nx  # type: ignore
+        from networkx.algorithms.community import greedy_modularity_communities  # type: ignore
+    except Exception:  # pragma: no cover
+        return None
+    return nx, greedy_modularity_communities
+
+
+@lru_cache(maxsize=None)
+def _load_tfidf() -> tuple[Any, Any, Any] | None:
+    """`(numpy, CountVectorizer, TfidfTransformer)` を返します。"""
+
+    try:  # pragma: no cover - optional dependency
+        import numpy as np  # type: ignore
+        from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer  # type: ignore
+    except Exception:  # pragma: no cover
+        return None
+    return np, CountVectorizer, TfidfTransformer
+
 
 try:  # pragma: no cover - optional dependency
     from slugify import slugify  # type: ignore
@@ -32,6 +57,135 @@ except Exception:  # pragma: no cover
         return "-".join(value.lower().split())
 
 
+_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+_NUM_RE = re.compile(r"\d+")
+_NON_KEY_RE = re.compile(r"[^a-z0-9{}-]+")
+_DIGIT_DELETION = str.maketrans("", "", "0123456789")
+# ASCII だけのラベルは Unicode 正規化が不要なため、slugify を通さずに変換する
+_FAST_SLUG_RE = re.compile(r"^[A-Za-z0-9 ._/\-]+$")
+_FAST_SLUG_SEPARATOR_RE = re.compile(r"[^a-z0-9]+")
+# クラスタリングで必要なのはスキーム・ホスト・パスのみのため、urlparse の代わりに 1 回の照合で切り出す
+_HTTP_URL_RE = re.compile(r"^(https?)://([^/?#]*)([^?#]*)", re.IGNORECASE)
+# 言語判定用の文字種。1 文字ずつ Python で判定せず、正規表現エンジン側で数える
+_JAPANESE_CHAR_RE = re.compile(r"[一-龥ぁ-ゖァ-ヺー]")
+_LATIN_CHAR_RE = re.compile(r"[A-Za-z]")
+_ALPHA_CHAR_RE = re.compile(r"[^\W\d_]")
+
+
+def _slugify_label(label: str) -> str:
+    if _FAST_SLUG_RE.match(label):
+        return _FAST_SLUG_SEPARATOR_RE.sub("-", label.lower()).strip("-")
+    return slugify(label)
+
+
+@lru_cache(maxsize=8192)
+def _normalize_url_segment(segment: str) -> str:
+    """URL のパス要素を、ID や数値を伏せたパターン用の表記へ正規化します。"""
+
+    cleaned = segment.strip().lower()
+    if not cleaned:
+        return ""
+    if "." in cleaned:
+        cleaned = cleaned.split(".")[0]
+    if _UUID_RE.fullmatch(cleaned):
+        return "{uuid}"
+    # 数字を取り除いた長さとの差で、文字ごとのループを回さずに数字の個数を求める
+    digit_count = len(cleaned) - len(cleaned.translate(_DIGIT_DELETION))
+    if digit_count and digit_count == len(cleaned):
+        return "{num}"
+    if digit_count >= 3 and digit_count / max(len(cleaned), 1) >= 0.5:
+        cleaned = _NUM_RE.sub("{num}", cleaned)
+    cleaned = _NON_KEY_RE.sub("-", cleaned)
+    cleaned = cleaned.strip("-")
+    return cleaned
+
+
+def _top_indices(np: Any, scores: Any, count: int) -> Any:
+    """スコア上位 `count` 件の添字を、降順かつ同点は元の順序で返します。"""
+
+    if scores.size <= count:
+        candidates = np.arange(scores.size)
+    else:
+        # 語彙全体はソートせず、境界値以上の候補だけを並べ替える
+        threshold = np.partition(scores, scores.size - count)[scores.size - count]
+        candidates = np.flatnonzero(scores >= threshold)
+    order = np.argsort(-scores[candidates], kind="stable")
+    return candidates[order][:count]
+
+
+def _connected_components(node_count: int, edges: Sequence[tuple[int, int]]) -> list[list[int]]:
+    """連番ノードの無向辺から、Union-Find で連結成分を求めます。"""
+
+    parent = array("i", range(node_count))
+    rank = bytearray(node_count)
+
+    def find(node: int) -> int:
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    for source, target in edges:
+        source_root = find(source)
+        target_root = find(target)
+        if source_root == target_root:
+            continue
+        if rank[source_root] < rank[target_root]:
+            source_root, target_root = target_root, source_root
+        parent[target_root] = source_root
+        if rank[source_root] == rank[target_root]:
+            rank[source_root] += 1
+    components: dict[int, list[int]] = defaultdict(list)
+    for node in range(node_count):
+        components[find(node)].append(node)
+    return list(components.values())
+
+
+@lru_cache(maxsize=4096)
+def _directory_key(file_path: Path, depth: int) -> str:
+    """アーカイブ内のパスから、ホスト名と先頭ディレクトリによるグループキーを求めます。
+
+    同じページのキーはディレクトリ集約と小グループ統合の両方で求めるため、結果をキャッシュします。
+    """
+
+    parts = file_path.parts
+    depth = max(0, depth)
+    host = ""
+    host_index = -1
+    try:
+        site_idx = parts.index("site_backup")
+        candidate = site_idx + 1
+        if candidate < len(parts):
+            host = parts[candidate]
+            host_index = candidate
+    except ValueError:
+        pass
+    if host_index == -1:
+        for idx, segment in enumerate(parts):
+            lowered = segment.lower()
+            if "." in segment and not lowered.endswith((".html", ".htm")):
+                host = segment
+                host_index = idx
+                break
+    rel_parts = parts[host_index + 1 :] if host_index >= 0 else parts
+    segments: list[str] = []
+    for segment in rel_parts:
+        lowered = segment.lower()
+        if lowered.endswith((".html", ".htm")):
+            break
+        segments.append(segment)
+        if depth and len(segments) >= depth:
+            break
+    if depth and not segments and rel_parts:
+        segments.append(rel_parts[0])
+    key_segments = [host] if depth == 0 else ([host] + segments if host else segments)
+    if depth == 0 and not host:
+        key_segments = ["root"]
+    return "/".join(key_segments) if key_segments else str(file_path.parent)
+
+
 @dataclass(slots=True)
 class Cluster:
     """関連性の高いページをまとめたグループ。"""
@@ -48,15 +202,17 @@ class SiteGraph:
     def __init__(self, config: GraphConfig) -> None:
         self._config = config
         self._logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
-        self._warn_missing_dependencies()
+        self._warned_dependencies: set[str] = set()
 
     def cluster(self, pages: Sequence[ExtractedPage]) -> list[Cluster]:
         if not pages:
             return []
-        adjacency = self._build_adjacency(pages)
-        groups = self._cluster_with_networkx(adjacency)
+        # ページ ID からの逆引きは各段階で共有し、辞書を作り直さない
+        page_lookup = {page.page_id: page for page in pages}
+        node_ids, edges = self._build_adjacency(pages)
+        groups = self._cluster_with_networkx(node_ids, edges)
         if groups:
-            groups = self._refine_large_network_groups(groups, pages)
+            groups = self._refine_large_network_groups(groups, page_lookup)
         if not groups:
             pattern_groups, remaining = self._cluster_by_url_pattern(pages)
             if pattern_groups:
@@ -67,17 +223,32 @@ class SiteGraph:
                         groups.extend(self._cluster_by_directory_groups(remaining_pages))
             else:
                 groups = self._cluster_by_directory_groups(pages)
-        groups = self._merge_small_groups(groups, pages)
+        groups = self._merge_small_groups(groups, page_lookup)
         if not groups and pages:
             groups = [set(page.page_id for page in pages)]
+        sorted_groups = [sorted(group) for group in groups]
+        # グループはすべて pages の ID から作られるため、逆引きの存在確認は不要
+        grouped_pages = [[page_lookup[pid] for pid in page_ids] for page_ids in sorted_groups]
+        # TF-IDF ラベルは全クラスタ分をまとめて推定する。ラベル推定が差し替えられていれば使われないため省く
+        text_labels = (
+            self._infer_labels_from_text(grouped_pages) if self._uses_default_label_inference() else None
+        )
+        return self._build_clusters(sorted_groups, grouped_pages, text_labels)
+
+    def _build_clusters(
+        self,
+        sorted_groups: Sequence[list[str]],
+        grouped_pages: Sequence[list[ExtractedPage]],
+        text_labels: Sequence[str] | None = None,
+    ) -> list[Cluster]:
         clusters: list[Cluster] = []
         used_slugs: set[str] = set()
-        page_lookup = {page.page_id: page for page in pages}
-        for idx, group in enumerate(groups, start=1):
-            page_ids = sorted(group)
-            ordered_pages = [page_lookup[pid] for pid in page_ids if pid in page_lookup]
-            label = self._infer_label(ordered_pages)
-            raw_slug = slugify(label) if label else ""
+        for idx, (page_ids, ordered_pages) in enumerate(zip(sorted_groups, grouped_pages), start=1):
+            if text_labels is None:
+                label = self._infer_label(ordered_pages)
+            else:
+                label = self._infer_label(ordered_pages, text_label=text_labels[idx - 1])
+            raw_slug = _slugify_label(label) if label else ""
             slug = self._ensure_unique_slug(raw_slug, used_slugs, idx)
             cluster_id = f"cl_{slug}"
             clusters.append(
@@ -92,22 +263,34 @@ class SiteGraph:
 
     # Helpers ----------------------------------------------------------
 
-    def _build_adjacency(self, pages: Sequence[ExtractedPage]) -> dict[str, set[str]]:
-        adjacency: dict[str, set[str]] = defaultdict(set)
-        url_to_id = {page.url: page.page_id for page in pages if page.url}
-        for page in pages:
-            for link in page.links:
-                target = url_to_id.get(link)
-                if target:
-                    adjacency[page.page_id].add(target)
-                    adjacency[target].add(page.page_id)
-        return adjacency
+    def _build_adjacency(self, pages: Sequence[ExtractedPage]) -> tuple[list[str], list[tuple[int, int]]]:
+        """リンクで結ばれたページ ID と、その連番に対する無向辺の一覧を返します。"""
 
-    def _refine_large_network_groups(self, groups: list[set[str]], pages: Sequence[ExtractedPage]) -> list[set[str]]:
+        url_to_index = {page.url: idx for idx, page in enumerate(pages) if page.url}
+        index_of = url_to_index.get
+        pairs: set[tuple[int, int]] = set()
+        add_pair = pairs.add
+        for idx, page in enumerate(pages):
+            for link in page.links:
+                target = index_of(link)
+                if target is None or target == idx:
+                    continue
+                add_pair((idx, target) if idx < target else (target, idx))
+        if not pairs:
+            return [], []
+        # 辺を持つページだけに詰め直した連番を振る
+        connected = sorted({idx for pair in pairs for idx in pair})
+        dense = {idx: position for position, idx in enumerate(connected)}
+        node_ids = [pages[idx].page_id for idx in connected]
+        edges = [(dense[source], dense[target]) for source, target in sorted(pairs)]
+        return node_ids, edges
+
+    def _refine_large_network_groups(
+        self, groups: list[set[str]], lookup: Mapping[str, ExtractedPage]
+    ) -> list[set[str]]:
         threshold = max(self._config.max_network_cluster_size, self._config.min_cluster_size)
         if threshold <= 0:
             return groups
-        lookup = {page.page_id: page for page in pages}
         refined: list[set[str]] = []
         for group in groups:
             if len(group) <= threshold:
@@ -127,52 +310,101 @@ class SiteGraph:
             refined.extend({pid} for pid in group)
         return refined
 
-    def _cluster_with_networkx(self, adjacency: dict[str, set[str]]) -> list[set[str]]:
-        if not adjacency or nx is None or greedy_modularity_communities is None:
-            return []
-        graph = nx.Graph()
-        for node, neighbors in adjacency.items():
-            graph.add_node(node)
-            for neighbor in neighbors:
-                graph.add_edge(node, neighbor)
-        if graph.number_of_nodes() == 0:
+    def _cluster_with_networkx(self, node_ids: Sequence[str], edges: Sequence[tuple[int, int]]) -> list[set[str]]:
+        if not node_ids or not edges:
             return []
-        communities = list(greedy_modularity_communities(graph))
-        groups = [set(map(str, community)) for community in communities if len(community) >= self._config.min_cluster_size]
+        igraph = _load_igraph()
+        networkx = _load_networkx() if igraph is None else None
+        if igraph is not None:
+            # networkx と同じ貪欲モジュラリティ最大化 (CNM) を C 実装で実行する
+            graph = igraph.Graph(n=len(node_ids), edges=list(edges), directed=False)
+            membership = graph.community_fastgreedy().as_clustering().membership
+            communities: dict[int, set[str]] = defaultdict(set)
+            for idx, community in enumerate(membership):
+                communities[community].add(node_ids[idx])
+            groups = list(communities.values())
+        elif networkx is not None:
+            nx, greedy_modularity_communities = networkx
+            graph = nx.Graph()
+            graph.add_nodes_from(range(len(node_ids)))
+            graph.add_edges_from(edges)
+            groups = [
+                {node_ids[idx] for idx in community} for community in greedy_modularity_communities(graph)
+            ]
+        else:
+            self._warn_missing_dependency(
+                "community",
+                "igraph と networkx のいずれも利用できないため、コミュニティ検出の代わりにリンクの連結成分でページをまとめます。",
+            )
+            groups = []
+        min_size = self._config.min_cluster_size
+        groups = [group for group in groups if len(group) >= min_size]
         if not groups:
-            return []
+            # コミュニティ検出が使えない・何も返さない場合は連結成分で代用する
+            groups = [
+                {node_ids[idx] for idx in component}
+                for component in _connected_components(len(node_ids), edges)
+                if len(component) >= min_size
+            ]
         return groups
 
     def _cluster_by_url_pattern(self, pages: Sequence[ExtractedPage]) -> tuple[list[set[str]], set[str]]:
         max_depth = max(1, self._config.url_pattern_depth)
+        # 深さごとに URL を解析し直さないよう、正規化済みのパス要素を先に求めておく
+        url_parts: dict[str, tuple[str, tuple[str, ...]] | None] = {}
+        for page in pages:
+            if page.url not in url_parts:
+                url_parts[page.url] = self._url_pattern_parts(page.url)
         best_groups: list[set[str]] = []
         best_remaining: set[str] = set()
         for depth in range(max_depth, 0, -1):
-            groups, remaining = self._cluster_by_url_pattern_with_depth(pages, depth)
+            buckets = self._url_pattern_buckets(pages, depth, url_parts)
+            groups, remaining = self._cluster_by_url_pattern_with_depth(pages, buckets)
             if groups and not self._all_singleton_groups(groups):
                 return groups, remaining
             if groups and not best_groups:
                 best_groups, best_remaining = groups, remaining
+            if len(buckets) <= 1:
+                # 全ページが 1 つのパターンに収まった深さより浅くしても分割結果は変わらない
+                break
         return best_groups, best_remaining
 
-    def _cluster_by_url_pattern_with_depth(self, pages: Sequence[ExtractedPage], depth: int) -> tuple[list[set[str]], set[str]]:
-        buckets: dict[str, set[str]] = defaultdict(set)
-        for page in pages:
-            pattern = self._extract_url_pattern(page.url, depth)
+    def _url_pattern_buckets(
+        self,
+        pages: Sequence[ExtractedPage],
+        depth: int,
+        url_parts: Mapping[str, tuple[str, tuple[str, ...]] | None],
+    ) -> dict[str, list[int]]:
+        """URL パターンごとに、該当するページの `pages` 内での位置をまとめます。"""
+
+        buckets: dict[str, list[int]] = defaultdict(list)
+        for index, page in enumerate(pages):
+            parts = url_parts.get(page.url)
+            if parts is None:
+                continue
+            pattern = self._format_url_pattern(*parts, depth)
             if not pattern:
                 continue
-            buckets[pattern].add(page.page_id)
+            buckets[pattern].append(index)
+        return buckets
+
+    def _cluster_by_url_pattern_with_depth(
+        self, pages: Sequence[ExtractedPage], buckets: Mapping[str, list[int]]
+    ) -> tuple[list[set[str]], set[str]]:
         if not buckets:
             return [], set()
         groups: list[set[str]] = []
-        assigned: set[str] = set()
-        for pattern in sorted(buckets):
-            members = buckets[pattern]
-            if len(members) >= self._config.min_cluster_size:
-                group = set(members)
+        # 割り当て済みかどうかはページ位置のビット列で管理し、ID のハッシュ計算を省く
+        assigned = bytearray(len(pages))
+        min_size = self._config.min_cluster_size
+        # パターン名での並べ替えは行わず、ページの出現順に沿ったバケット順をそのまま使う
+        for members in buckets.values():
+            group = {pages[index].page_id for index in members}
+            if len(group) >= min_size:
                 groups.append(group)
-                assigned.update(group)
-        remaining = {page.page_id for page in pages if page.page_id not in assigned}
+                for index in members:
+                    assigned[index] = 1
+        remaining = {page.page_id for page, flag in zip(pages, assigned) if not flag}
         return groups, remaining
 
     def _all_singleton_groups(self, groups: Sequence[set[str]]) -> bool:
@@ -182,7 +414,7 @@ class SiteGraph:
         depth = max(1, self._config.directory_cluster_depth)
         buckets: dict[str, set[str]] = defaultdict(set)
         for page in pages:
-            key = self._directory_key(page.file_path, depth)
+            key = _directory_key(page.file_path, depth)
             buckets[key].add(page.page_id)
         groups: list[set[str]] = []
         threshold = max(2, self._config.min_cluster_size)
@@ -193,11 +425,10 @@ class SiteGraph:
                 groups.append(group)
         return groups
 
-    def _merge_small_groups(self, groups: list[set[str]], pages: Sequence[ExtractedPage]) -> list[set[str]]:
+    def _merge_small_groups(self, groups: list[set[str]], lookup: Mapping[str, ExtractedPage]) -> list[set[str]]:
         threshold = max(2, self._config.min_cluster_size)
         if self._config.allow_singleton_clusters or threshold <= 1:
             return groups
-        lookup = {page.page_id: page for page in pages}
         large = [group for group in groups if len(group) >= threshold]
         small_ids: list[str] = [pid for group in groups if len(group) < threshold for pid in group]
         if not small_ids:
@@ -207,7 +438,7 @@ class SiteGraph:
             page = lookup.get(pid)
             if page is None:
                 continue
-            key = self._directory_key(page.file_path, depth=0)
+            key = _directory_key(page.file_path, 0)
             buckets[key].append(pid)
         merged: list[set[str]] = []
         leftovers: list[str] = []
@@ -221,138 +452,153 @@ class SiteGraph:
             merged.append(set(leftovers))
         return large + merged
 
-    def _directory_key(self, file_path: Path, depth: int) -> str:
-        parts = file_path.parts
-        depth = max(0, depth)
-        host = ""
-        host_index = -1
-        try:
-            site_idx = parts.index("site_backup")
-            candidate = site_idx + 1
-            if candidate < len(parts):
-                host = parts[candidate]
-                host_index = candidate
-        except ValueError:
-            pass
-        if host_index == -1:
-            for idx, segment in enumerate(parts):
-                lowered = segment.lower()
-                if "." in segment and not lowered.endswith((".html", ".htm")):
-                    host = segment
-                    host_index = idx
-                    break
-        rel_parts = parts[host_index + 1 :] if host_index >= 0 else parts
-        segments: list[str] = []
-        for segment in rel_parts:
-            lowered = segment.lower()
-            if lowered.endswith((".html", ".htm")):
-                break
-            segments.append(segment)
-            if depth and len(segments) >= depth:
-                break
-        if depth and not segments and rel_parts:
-            segments.append(rel_parts[0])
-        key_segments = [host] if depth == 0 else ([host] + segments if host else segments)
-        if depth == 0 and not host:
-            key_segments = ["root"]
-        return "/".join(key_segments) if key_segments else str(file_path.parent)
-
-    def _extract_url_pattern(self, url: str, depth: int) -> str:
+    def _url_pattern_parts(self, url: str) -> tuple[str, tuple[str, ...]] | None:
         if not url:
-            return ""
-        parsed = urlparse(url)
-        if parsed.scheme not in {"http", "https"}:
-            return ""
-        segments = [segment for segment in parsed.path.split("/") if segment]
-        normalized = [self._normalize_url_segment(segment) for segment in segments]
-        normalized = [segment for segment in normalized if segment]
-        if not normalized or depth <= 0:
+            return None
+        match = _HTTP_URL_RE.match(url)
+        if match is None:
+            return None
+        _, netloc, path = match.groups()
+        normalized = tuple(
+            segment
+            for segment in (_normalize_url_segment(raw) for raw in path.split("/") if raw)
+            if segment
+        )
+        if not normalized:
+            return None
+        return netloc, normalized
+
+    def _format_url_pattern(self, base: str, normalized: tuple[str, ...], depth: int) -> str:
+        if depth <= 0:
             return ""
         actual_depth = max(1, min(depth, len(normalized)))
-        pattern_segments = normalized[:actual_depth]
-        pattern = "/".join(pattern_segments)
-        base = parsed.netloc or ""
+        pattern = "/".join(normalized[:actual_depth])
         return f"{base}/{pattern}" if base else pattern
 
-    def _normalize_url_segment(self, segment: str) -> str:
-        cleaned = segment.strip().lower()
-        if not cleaned:
-            return ""
-        if "." in cleaned:
-            cleaned = cleaned.split(".")[0]
-        if re.fullmatch(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", cleaned):
-            return "{uuid}"
-        digit_count = sum(ch.isdigit() for ch in cleaned)
-        if digit_count and digit_count == len(cleaned):
-            return "{num}"
-        if digit_count >= 3 and digit_count / max(len(cleaned), 1) >= 0.5:
-            cleaned = re.sub(r"\d+", "{num}", cleaned)
-        cleaned = re.sub(r"[^a-z0-9{}-]+", "-", cleaned)
-        cleaned = cleaned.strip("-")
-        return cleaned
-
-    def _infer_label(self, pages: Sequence[ExtractedPage]) -> str:
+    def _uses_default_label_inference(self) -> bool:
+        """`_infer_label` がサブクラスやインスタンスで差し替えられていなければ True を返します。"""
+
+        return "_infer_label" not in vars(self) and type(self)._infer_label is SiteGraph._infer_label
+
+    def _infer_label(self, pages: Sequence[ExtractedPage], text_label: str | None = None) -> str:
+        """クラスタのラベルを推定します。
+
+        `text_label` には一括推定済みの TF-IDF ラベルを渡せます。省略時はこのクラスタ単独で推定します。
+        """
+
         if not pages:
             return ""
-        text_label = self._infer_label_from_text(pages)
+        if text_label is None:
+            text_label = self._infer_label_from_text(pages)
         if text_label:
             return text_label
         url_label = self._infer_label_from_url_prefix(pages)
         if url_label:
             return url_label
-        first = pages[0].markdown.splitlines()[0] if pages[0].markdown else ""
+        first = pages[0].markdown.partition("\n")[0] if pages[0].markdown else ""
         return first[:50]
 
     def _infer_label_from_text(self, pages: Sequence[ExtractedPage]) -> str:
-        documents = [page.markdown for page in pages if page.markdown.strip()]
-        if not documents:
+        return self._infer_labels_from_text([pages])[0]
+
+    def _infer_labels_from_text(self, page_groups: Sequence[Sequence[ExtractedPage]]) -> list[str]:
+        """クラスタごとの TF-IDF ラベルをまとめて推定します。
+
+        文書のトークン化は言語ごとに 1 回だけ行い、語彙の絞り込みと IDF は
+        従来どおりクラスタ単位で計算します。
+        """
+
+        labels = [""] * len(page_groups)
+        documents_per_group = [
+            [page.markdown for page in pages if page.markdown.strip()] for pages in page_groups
+        ]
+        tfidf = _load_tfidf()
+        if tfidf is None:
+            if any(documents_per_group):
+                self._warn_missing_dependency(
+                    "tfidf",
+                    "scikit-learn の TfidfVectorizer が利用できないため、TF-IDF によるクラスタラベル推定をスキップします。",
+                )
+            for index, documents in enumerate(documents_per_group):
+                if documents:
+                    labels[index] = self._headline_label(documents)
+            return labels
+        np, CountVectorizer, TfidfTransformer = tfidf
+        # ストップワードは言語ごとに異なるため、判定結果ごとに 1 つのコーパスへまとめる
+        by_language: dict[str, list[int]] = defaultdict(list)
+        for index, documents in enumerate(documents_per_group):
+            if documents:
+                by_language[self._detect_language(documents)].append(index)
+        for language, indices in by_language.items():
+            corpus: list[str] = []
+            bounds: list[tuple[int, int]] = []
+            for index in indices:
+                start = len(corpus)
+                corpus.extend(documents_per_group[index])
+                bounds.append((start, len(corpus)))
+            try:
+                vectorizer = CountVectorizer(**self._label_vectorizer_kwargs(language))
+                counts = vectorizer.fit_transform(corpus).tocsr()
+                terms = vectorizer.get_feature_names_out()
+            except Exception:
+                for index in indices:
+                    labels[index] = self._headline_label(documents_per_group[index])
+                continue
+            for index, (start, stop) in zip(indices, bounds):
+                labels[index] = self._label_from_counts(
+                    np, TfidfTransformer, counts[start:stop], terms
+                ) or self._headline_label(documents_per_group[index])
+        return labels
+
+    def _label_vectorizer_kwargs(self, language: str) -> dict[str, Any]:
+        vectorizer_kwargs: dict[str, Any] = {}
+        if self._config.label_token_pattern:
+            vectorizer_kwargs["token_pattern"] = self._config.label_token_pattern
+        stop_words: Any
+        if language == "en":
+            stop_words = "english"
+        elif language == "ja":
+            stop_words = list(self._config.label_stop_words)
+        else:
+            stop_words = None
+        if stop_words:
+            vectorizer_kwargs["stop_words"] = stop_words
+        return vectorizer_kwargs
+
+    def _label_from_counts(self, np: Any, TfidfTransformer: Any, counts: Any, terms: Any) -> str:
+        """1 クラスタ分の出現頻度行列から上位語を選びます。"""
+
+        frequencies = np.asarray(counts.sum(axis=0)).ravel()
+        present = np.flatnonzero(frequencies)
+        if present.size == 0:
             return ""
-        if TfidfVectorizer is None:
-            headline = documents[0].splitlines()[0] if documents[0] else ""
-            return headline[:50]
-        try:
-            vectorizer_kwargs: dict[str, Any] = {
-                "max_features": self._config.label_tfidf_terms,
-            }
-            if self._config.label_token_pattern:
-                vectorizer_kwargs["token_pattern"] = self._config.label_token_pattern
-            language = self._detect_language(documents)
-            stop_words: Any
-            if language == "en":
-                stop_words = "english"
-            elif language == "ja":
-                stop_words = list(self._config.label_stop_words)
-            else:
-                stop_words = None
-            if stop_words:
-                vectorizer_kwargs["stop_words"] = stop_words
-            vectorizer = TfidfVectorizer(**vectorizer_kwargs)
-            matrix = vectorizer.fit_transform(documents)
-            summed = matrix.sum(axis=0)
-            scores = zip(vectorizer.get_feature_names_out(), summed.A1)
-            top_terms = [term for term, score in sorted(scores, key=lambda x: x[1], reverse=True) if term]
-            return " ".join(top_terms[:3])
-        except Exception:
-            headline = documents[0].splitlines()[0] if documents[0] else ""
-            return headline[:50]
-
-    def _warn_missing_dependencies(self) -> None:
-        if nx is None or greedy_modularity_communities is None:
-            self._logger.warning(
-                "networkx が利用できないため、グラフベースのコミュニティ検出をスキップし、URL/ディレクトリベースのフォールバックのみを使用します。"
-            )
-        if TfidfVectorizer is None:
-            self._logger.warning(
-                "scikit-learn の TfidfVectorizer が利用できないため、TF-IDF によるクラスタラベル推定をスキップします。"
-            )
+        limit = self._config.label_tfidf_terms
+        if limit and present.size > limit:
+            # max_features と同様に、クラスタ内の出現頻度が高い語だけを残す
+            present = np.sort(present[np.argsort(-frequencies[present])[:limit]])
+        matrix = TfidfTransformer().fit_transform(counts[:, present].astype(np.float32))
+        summed = np.asarray(matrix.sum(axis=0)).ravel()
+        top_terms = [term for term in terms[present[_top_indices(np, summed, 3)]] if term]
+        return " ".join(top_terms)
+
+    @staticmethod
+    def _headline_label(documents: Sequence[str]) -> str:
+        headline = documents[0].partition("\n")[0] if documents[0] else ""
+        return headline[:50]
+
+    def _warn_missing_dependency(self, key: str, message: str) -> None:
+        if key in self._warned_dependencies:
+            return
+        self._warned_dependencies.add(key)
+        self._logger.warning(message)
 
     def _detect_language(self, documents: Sequence[str]) -> str:
         sample = "".join(documents)[:5000]
         if not sample:
             return ""
-        japanese = sum(1 for char in sample if self._is_japanese_char(char))
-        latin = sum(1 for char in sample if char.isalpha() and "a" <= char.lower() <= "z")
-        total = sum(1 for char in sample if char.isalpha())
+        japanese = len(_JAPANESE_CHAR_RE.findall(sample))
+        latin = len(_LATIN_CHAR_RE.findall(sample))
+        total = len(_ALPHA_CHAR_RE.findall(sample))
         if total == 0:
             return ""
         if japanese / total >= 0.2:
@@ -361,33 +607,15 @@ class SiteGraph:
             return "en"
         return ""
 
-    def _is_japanese_char(self, char: str) -> bool:
-        return (
-            "一" <= char <= "龥"
-            or "ぁ" <= char <= "ゖ"
-            or "ァ" <= char <= "ヺ"
-            or char == "ー"
-        )
-
     def _infer_label_from_url_prefix(self, pages: Sequence[ExtractedPage]) -> str:
-        http_pages = [page for page in pages if page.url.startswith(("http://", "https://"))]
-        if not http_pages:
+        matches = [match for match in (_HTTP_URL_RE.match(page.url) for page in pages) if match is not None]
+        if not matches:
             return ""
-        parsed_pages = [urlparse(page.url) for page in http_pages]
-        hosts = [parsed.netloc for parsed in parsed_pages if parsed.netloc]
+        hosts = [match.group(2) for match in matches if match.group(2)]
         host = hosts[0] if hosts and all(item == hosts[0] for item in hosts) else ""
-        path_segments: list[list[str]] = []
-        for parsed in parsed_pages:
-            segments = [segment for segment in parsed.path.split("/") if segment]
-            path_segments.append(segments)
-        common: list[str] = []
-        min_length = min((len(segments) for segments in path_segments if segments), default=0)
-        for index in range(min_length):
-            candidate = path_segments[0][index]
-            if all(len(segments) > index and segments[index] == candidate for segments in path_segments):
-                common.append(candidate)
-            else:
-                break
+        path_segments = [[segment for segment in match.group(3).split("/") if segment] for match in matches]
+        # commonprefix は文字列に限らずシーケンスの列にも使え、比較を C 側で行う
+        common: list[str] = list(commonprefix(path_segments))
         if not (host or common):
             return ""
         if host and common:
@@ -5,13 +5,42 @@ from __future__ import annotations
 import json
 import re
 from dataclasses import dataclass
-from typing import Mapping, Sequence
+from typing import Iterator, Mapping, Sequence
 
 from .config import QualityConfig
 from .document import build_summary_snippets
 from .extraction import ExtractedPage
 from .graphing import Cluster
 
+try:  # pragma: no cover - optional dependency
+    import ahocorasick  # type: ignore
+except Exception:  # pragma: no cover
+    ahocorasick = None  # type: ignore[misc]
+
+
+def _find_missing_terms(terms: Sequence[str], text: str) -> set[str]:
+    """`text` に現れない語の集合を返します。
+
+    pyahocorasick が利用できる場合は全ての語を 1 回の走査で照合し、
+    語ごとに本文全体を検索し直すことを避けます。
+    """
+
+    unique_terms = {term for term in terms if term}
+    if not unique_terms:
+        return set()
+    if ahocorasick is None or len(unique_terms) == 1:
+        return {term for term in unique_terms if term not in text}
+    automaton = ahocorasick.Automaton()
+    for term in unique_terms:
+        automaton.add_word(term, term)
+    automaton.make_automaton()
+    remaining = set(unique_terms)
+    for _, term in automaton.iter(text):
+        remaining.discard(term)
+        if not remaining:
+            break
+    return remaining
+
 
 @dataclass(slots=True)
 class HallucinationFinding:
@@ -62,7 +91,12 @@ class HallucinationGuard:
         resolved_pages: Mapping[str, Sequence[ExtractedPage]],
     ) -> HallucinationReport:
         findings: list[HallucinationFinding] = []
+        extend_findings = findings.extend
         inspected_pages = 0
+        # 複数クラスタに属するページもあるため、小文字化した本文はラベル照合で必要になった時点で
+        # ページごとに 1 度だけ作り、以降のクラスタでは使い回す
+        lowered_markdown: dict[str, str] = {}
+        grounded_snippets: dict[tuple[str, str], bool] = {}
         for cluster in clusters:
             pages = list(resolved_pages.get(cluster.cluster_id, ()))
             inspected_pages += len(pages)
@@ -76,9 +110,10 @@ class HallucinationGuard:
                     )
                 )
                 continue
-            findings.extend(self._evaluate_page_quality(cluster, pages))
-            findings.extend(self._evaluate_label_grounding(cluster, pages))
-            findings.extend(self._evaluate_summary_grounding(cluster, pages))
+            # 各検査はジェネレーターとして結果を返し、中間リストを作らずに追記する
+            extend_findings(self._evaluate_page_quality(cluster, pages))
+            extend_findings(self._evaluate_label_grounding(cluster, pages, lowered_markdown))
+            extend_findings(self._evaluate_summary_grounding(cluster, pages, grounded_snippets))
         return HallucinationReport(
             findings=findings,
             inspected_clusters=len(clusters),
@@ -89,94 +124,108 @@ class HallucinationGuard:
 
     def _evaluate_page_quality(
         self, cluster: Cluster, pages: Sequence[ExtractedPage]
-    ) -> list[HallucinationFinding]:
-        findings: list[HallucinationFinding] = []
+    ) -> Iterator[HallucinationFinding]:
         min_chars = max(0, self._config.min_page_characters)
         for page in pages:
             normalized = page.markdown.strip()
             if len(normalized) < min_chars:
-                findings.append(
-                    HallucinationFinding(
-                        cluster_id=cluster.cluster_id,
-                        page_id=page.page_id,
-                        kind="insufficient_content",
-                        message=(
-                            f"ページ本文が {len(normalized)} 文字しかないため、"
-                            f"抽出結果の信頼性が十分とは言えません (閾値: {min_chars})。"
-                        ),
-                    )
+                yield HallucinationFinding(
+                    cluster_id=cluster.cluster_id,
+                    page_id=page.page_id,
+                    kind="insufficient_content",
+                    message=(
+                        f"ページ本文が {len(normalized)} 文字しかないため、"
+                        f"抽出結果の信頼性が十分とは言えません (閾値: {min_chars})。"
+                    ),
                 )
             if self._config.require_source_url and not page.url:
-                findings.append(
-                    HallucinationFinding(
-                        cluster_id=cluster.cluster_id,
-                        page_id=page.page_id,
-                        kind="missing_source_url",
-                        message="URL が空のため、回答根拠を追跡できません。",
-                    )
+                yield HallucinationFinding(
+                    cluster_id=cluster.cluster_id,
+                    page_id=page.page_id,
+                    kind="missing_source_url",
+                    message="URL が空のため、回答根拠を追跡できません。",
                 )
-        return findings
 
     def _evaluate_label_grounding(
-        self, cluster: Cluster, pages: Sequence[ExtractedPage]
-    ) -> list[HallucinationFinding]:
+        self,
+        cluster: Cluster,
+        pages: Sequence[ExtractedPage],
+        lowered_markdown: dict[str, str] | None = None,
+    ) -> Iterator[HallucinationFinding]:
         if not cluster.label:
-            return []
-        combined_text = "\n".join(page.markdown.lower() for page in pages if page.markdown)
-        if not combined_text.strip():
-            return []
+            return
         min_token_length = max(1, self._config.label_min_token_length)
         tokens = [
             token
             for token in re.split(r"[\s\-/|,_]+", cluster.label.lower())
             if len(token) >= min_token_length
         ]
-        findings: list[HallucinationFinding] = []
+        if not tokens:
+            # 照合する語が残らなければ本文を連結する必要もない
+            return
+        cache = lowered_markdown if lowered_markdown is not None else {}
+        lowered_texts: list[str] = []
+        for page in pages:
+            if not page.markdown:
+                continue
+            lowered = cache.get(page.page_id)
+            if lowered is None:
+                lowered = cache[page.page_id] = page.markdown.lower()
+            lowered_texts.append(lowered)
+        combined_text = "\n".join(lowered_texts)
+        if not combined_text.strip():
+            return
+        missing = _find_missing_terms(tokens, combined_text)
         for token in tokens:
-            if token and token not in combined_text:
-                findings.append(
-                    HallucinationFinding(
-                        cluster_id=cluster.cluster_id,
-                        page_id=None,
-                        kind="label_not_in_content",
-                        message=(
-                            f"クラスタラベルの語 '{token}' が、いずれのページ本文にも"
-                            " 含まれていません。命名とコンテンツのズレが疑われます。"
-                        ),
-                    )
+            if token and token in missing:
+                yield HallucinationFinding(
+                    cluster_id=cluster.cluster_id,
+                    page_id=None,
+                    kind="label_not_in_content",
+                    message=(
+                        f"クラスタラベルの語 '{token}' が、いずれのページ本文にも"
+                        " 含まれていません。命名とコンテンツのズレが疑われます。"
+                    ),
                 )
-        return findings
 
     def _evaluate_summary_grounding(
-        self, cluster: Cluster, pages: Sequence[ExtractedPage]
-    ) -> list[HallucinationFinding]:
+        self,
+        cluster: Cluster,
+        pages: Sequence[ExtractedPage],
+        grounded_snippets: dict[tuple[str, str], bool] | None = None,
+    ) -> Iterator[HallucinationFinding]:
         snippets = build_summary_snippets(
             pages, limit=max(1, self._config.summary_snippet_limit)
         )
         if not snippets:
-            return []
+            return
         lookup = {page.page_id: page for page in pages}
-        findings: list[HallucinationFinding] = []
+        snippets_by_page: dict[str, list[str]] = {}
         for page_id, snippet in snippets:
-            page = lookup.get(page_id)
-            if page is None or not snippet:
-                continue
-            if snippet not in page.markdown:
-                findings.append(
-                    HallucinationFinding(
-                        cluster_id=cluster.cluster_id,
-                        page_id=page_id,
-                        kind="summary_not_in_source",
-                        message="サマリーの文が元ページ本文に見つかりません。",
-                    )
-                )
-        if len(snippets) < min(len(pages), self._config.summary_snippet_limit):
-            findings.append(
-                HallucinationFinding(
+            if snippet and page_id in lookup:
+                snippets_by_page.setdefault(page_id, []).append(snippet)
+        cache = grounded_snippets if grounded_snippets is not None else {}
+        missing: set[tuple[str, str]] = set()
+        for page_id, page_snippets in snippets_by_page.items():
+            # 複数クラスタで同じページと文を照合する場合は前回の結果を再利用する
+            unchecked = [snippet for snippet in page_snippets if (page_id, snippet) not in cache]
+            if unchecked:
+                not_found = _find_missing_terms(unchecked, lookup[page_id].markdown)
+                for snippet in unchecked:
+                    cache[(page_id, snippet)] = snippet not in not_found
+            missing.update((page_id, snippet) for snippet in page_snippets if not cache[(page_id, snippet)])
+        for page_id, snippet in snippets:
+            if (page_id, snippet) in missing:
+                yield HallucinationFinding(
                     cluster_id=cluster.cluster_id,
-                    page_id=None,
-                    kind="insufficient_summary_coverage",
-                    message="想定より少ないサマリーしか生成できませんでした。",
+                    page_id=page_id,
+                    kind="summary_not_in_source",
+                    message="サマリーの文が元ページ本文に見つかりません。",
                 )
+        if len(snippets) < min(len(pages), self._config.summary_snippet_limit):
+            yield HallucinationFinding(
+                cluster_id=cluster.cluster_id,
+                page_id=None,
+                kind="insufficient_summary_coverage",
+                message="想定より少ないサマリーしか生成できませんでした。",
             )
-        return findings
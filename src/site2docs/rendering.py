@@ -3,11 +3,16 @@
 from __future__ import annotations
 
 import asyncio
+import codecs
+import hashlib
 import logging
 import os
+import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Awaitable, Callable, Iterable, Literal
+from typing import Any, Callable, Iterable, Literal, Sequence
 
 from .config import RenderConfig
 
@@ -24,6 +29,12 @@ try:  # pragma: no cover - optional dependency
 except Exception:  # pragma: no cover
     detect_charset = None  # type: ignore[misc]
 
+try:  # pragma: no cover - optional dependency
+    # C 実装で GIL を解放するため、スレッドやプロセスに分けた読み込みでも並列に判定できる
+    from cchardet import detect as cchardet_detect  # type: ignore
+except Exception:  # pragma: no cover
+    cchardet_detect = None  # type: ignore[misc]
+
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +56,39 @@ class RenderedPage:
 ProgressCallback = Callable[[int, int, Path], None]
 
 
+# ローカル HTML から外部ネットワークへ出る要求だけを止める。file: や data: は Python を経由させない
+_NETWORK_URL_RE = re.compile(r"^(?:https?|wss?|ftp)://", re.IGNORECASE)
+
+# 文字コード判定器を呼ぶ前に試す、安価な判定の材料
+_BYTE_ORDER_MARKS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_META_CHARSET_RE = re.compile(rb"""charset\s*=\s*["']?([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+_META_CHARSET_WINDOW = 2048
+# cchardet の判定がこれより曖昧な場合は charset_normalizer に委ねる
+_CCHARDET_MIN_CONFIDENCE = 0.5
+
+# 静的なドキュメントでは Service Worker が不要なため、コンテキストごとの登録処理を省く。
+# ページ側のスクリプト挙動が変わる bypass_csp などは context_options で明示的に指定する
+_DEFAULT_CONTEXT_OPTIONS: dict[str, Any] = {"service_workers": "block"}
+
+# Playwright の networkidle は、この秒数だけ通信が途絶えた時点で成立する
+_NETWORK_IDLE_WINDOW = 0.5
+
+# 長時間のクロールで /dev/shm が溢れないよう、起動引数の既定値として渡す
+_DEFAULT_LAUNCH_ARGS = ("--disable-dev-shm-usage",)
+
+
+@dataclass(slots=True)
+class _PooledContext:
+    """コンテキストと、そのコンテキストで処理したページ数。"""
+
+    context: BrowserContext
+    uses: int = 0
+
+
 _AUTO_EXPAND_HEURISTICS = """
 () => {
     const clicked = new Set();
@@ -105,6 +149,8 @@ _AUTO_EXPAND_BY_TEXT = """
     if (!lowered.length) {
         return 0;
     }
+    // 候補文字列ごとに includes を繰り返さず、1 つの正規表現でまとめて照合する
+    const pattern = new RegExp(lowered.map((text) => text.replace(/[.*+?^${}()|[\\]\\\\]/g, '\\\\$&')).join('|'));
     let count = 0;
     const elements = Array.from(document.querySelectorAll('button, [role="button"], a'));
     for (const element of elements) {
@@ -112,7 +158,7 @@ _AUTO_EXPAND_BY_TEXT = """
         if (!label) {
             continue;
         }
-        if (lowered.some((text) => label.includes(text))) {
+        if (pattern.test(label)) {
             element.click();
             count += 1;
         }
@@ -122,81 +168,267 @@ _AUTO_EXPAND_BY_TEXT = """
 """
 
 
+# 展開処理はコンテキスト作成時に初期化スクリプトとして一度だけ登録し、
+# ページごとの evaluate では関数名を呼ぶだけにして転送量とスクリプトの再コンパイルを省く。
+# スクロールと 2 種類の展開処理は 1 回の呼び出しにまとめ、ページとの往復を減らす
+_AUTO_EXPAND_SETUP = (
+    "window.__s2dAutoExpand = "
+    + _AUTO_EXPAND_HEURISTICS.strip()
+    + ";\nwindow.__s2dExpandByText = "
+    + _AUTO_EXPAND_BY_TEXT.strip()
+    + """;
+window.__s2dExpand = async (opts) => {
+    // 固定時間眠らず、2 フレーム分 (レイアウトと描画) を待ってから読み込みの様子を見る
+    const nextFrames = () => new Promise((resolve) => requestAnimationFrame(() => requestAnimationFrame(resolve)));
+    // Resource Timing には完了した読み込みしか載らないため、表示範囲で読み込み中の画像も確認する
+    const loadingImages = () => Array.prototype.some.call(document.images, (img) => {
+        if (img.complete) {
+            return false;
+        }
+        const rect = img.getBoundingClientRect();
+        return rect.bottom >= 0 && rect.top <= window.innerHeight;
+    });
+    let resourceCount = performance.getEntriesByType('resource').length;
+    for (let i = 0; i < opts.iterations; i++) {
+        window.scrollBy(0, document.body.scrollHeight);
+        await nextFrames();
+        // scroll_pause を上限に、リソースが増え続けるか画像が読み込み中の間だけ待ち足す
+        const deadline = performance.now() + opts.pauseMs;
+        while (performance.now() < deadline) {
+            const currentCount = performance.getEntriesByType('resource').length;
+            if (currentCount === resourceCount && !loadingImages()) {
+                break;
+            }
+            resourceCount = currentCount;
+            await new Promise((resolve) => setTimeout(resolve, Math.min(50, deadline - performance.now())));
+        }
+    }
+    let count = 0;
+    if (opts.heuristics) {
+        count += window.__s2dAutoExpand();
+    }
+    if (opts.texts.length) {
+        count += window.__s2dExpandByText(opts.texts);
+    }
+    return count;
+};
+"""
+)
+
+_AUTO_EXPAND_CALL = "(opts) => window.__s2dExpand(opts)"
+
+
 class PageRenderer:
     """Playwright を用いて HTML ページをレンダリングし、利用不可の場合はフォールバックします。"""
 
     def __init__(self, config: RenderConfig) -> None:
         self._config = config
+        # ページごとに参照する設定値は、正規化済みの形で一度だけ求めておく
+        self._max_attempts = max(1, config.max_render_attempts)
+        self._timeout_backoff = max(1.0, config.timeout_backoff_factor)
+        self._post_render_delay = max(0.0, config.post_render_delay)
+        self._expand_options: dict[str, Any] | None = None
+        if config.max_scroll_iterations > 0 or config.auto_expand_candidates or config.expand_texts:
+            self._expand_options = {
+                "iterations": max(0, config.max_scroll_iterations),
+                "pauseMs": max(0, int(config.scroll_pause * 1000)),
+                "heuristics": bool(config.auto_expand_candidates),
+                "texts": list(config.expand_texts),
+            }
+        # ブラウザとコンテキストは render_many の呼び出しをまたいで再利用し、aclose() で解放する
+        self._playwright: Any | None = None
+        self._browser: Any | None = None
+        self._contexts: list[_PooledContext] = []
+        self._contexts_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> PageRenderer:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """再利用中のコンテキスト・ブラウザ・Playwright を終了します。"""
+
+        async with self._contexts_lock:
+            contexts, self._contexts = self._contexts, []
+            for pooled in contexts:
+                try:
+                    await pooled.context.close()
+                except Exception:
+                    logger.debug("コンテキストクローズ中に例外が発生しました。", exc_info=True)
+            browser, self._browser = self._browser, None
+            if browser is not None:
+                try:
+                    await browser.close()
+                except Exception:
+                    logger.debug("ブラウザクローズ中に例外が発生しました。", exc_info=True)
+            playwright, self._playwright = self._playwright, None
+            if playwright is not None:
+                await playwright.stop()
+
+    async def _ensure_browser(self, worker_count: int) -> list[_PooledContext]:
+        """ブラウザを起動済みにし、少なくとも ``worker_count`` 個のコンテキストを用意します。"""
+
+        async with self._contexts_lock:
+            if self._browser is None:
+                launch_kwargs = (
+                    dict(self._config.launch_options)
+                    if self._config.launch_options is not None
+                    else {}
+                )
+                launch_kwargs.setdefault("args", list(_DEFAULT_LAUNCH_ARGS))
+                playwright = await async_playwright().start()  # type: ignore[misc]
+                try:
+                    self._browser = await playwright.chromium.launch(**launch_kwargs)
+                except BaseException:
+                    await playwright.stop()
+                    raise
+                self._playwright = playwright
+            while len(self._contexts) < worker_count:
+                self._contexts.append(_PooledContext(await self._new_context()))
+            return self._contexts[:worker_count]
 
     async def render_many(self, paths: Iterable[Path], progress: ProgressCallback | None = None) -> list[RenderedPage]:
-        """ローカル HTML ファイルを順番にレンダリングします。"""
+        """ローカル HTML ファイルを順番にレンダリングします。
+
+        ブラウザは呼び出し後も起動したまま残るため、使い終えたら ``aclose()`` を呼び出してください。
+        コンテキストはワーカーに固定で割り当てるため、同じインスタンスで並行に呼び出さないでください。
+        """
 
         path_list = list(paths)
         if not path_list:
             return []
 
-        pages: list[RenderedPage] = []
         if async_playwright is None:
             logger.warning(
                 "Playwright が利用できないため、ローカル HTML をそのまま使用します。"
             )
-            total = len(path_list)
-            for index, path in enumerate(path_list, start=1):
-                pages.append(self._read_without_render(path, reason="playwright_unavailable"))
-                if progress is not None:
-                    progress(index, total, path)
-                else:
-                    logger.info("Playwright を利用せずに読み込みました (%d/%d): %s", index, total, path.name)
-            return pages
-
-        async with async_playwright() as playwright:  # type: ignore[misc]
-            launch_kwargs = (
-                dict(self._config.launch_options)
-                if self._config.launch_options is not None
-                else {}
-            )
-            browser = await playwright.chromium.launch(**launch_kwargs)
-            total = len(path_list)
-            results: list[RenderedPage | None] = [None] * total
-            worker_count = self._determine_worker_count(total)
-            contexts: list[BrowserContext] = [await browser.new_context() for _ in range(worker_count)]
-            context_pool: asyncio.Queue[BrowserContext] = asyncio.Queue()
-            for context in contexts:
-                context_pool.put_nowait(context)
-            progress_lock = asyncio.Lock()
-            completed = 0
-
-            async def notify_progress(path: Path) -> None:
-                nonlocal completed
-                async with progress_lock:
-                    completed += 1
-                    current = completed
-                if progress is not None:
-                    progress(current, total, path)
-                else:
-                    logger.info("レンダリング中 (%d/%d): %s", current, total, path.name)
-
-            async def process(index: int, path: Path) -> None:
-                context = await context_pool.get()
+            return await self._read_many_without_render(path_list, progress)
+
+        total = len(path_list)
+        results: list[RenderedPage | None] = [None] * total
+        sizes = [_file_size(path) for path in path_list]
+        # 内容が同一のファイルは代表の 1 件だけをレンダリングし、結果を複製する
+        duplicates: dict[int, int] = {}
+        if self._config.deduplicate_identical_files:
+            duplicates = await asyncio.to_thread(_find_duplicate_files, path_list, sizes)
+        render_indices = [index for index in range(total) if index not in duplicates]
+        worker_count = self._determine_worker_count(len(render_indices))
+        contexts = await self._ensure_browser(worker_count)
+        completed = 0
+        log_interval = _progress_log_interval(total)
+
+        def notify_progress(path: Path) -> None:
+            # 単一のイベントループ上でのみ更新されるため、ロックは不要
+            nonlocal completed
+            completed += 1
+            if progress is not None:
+                progress(completed, total, path)
+            elif completed == total or completed % log_interval == 0:
+                logger.info("レンダリング中 (%d/%d): %s", completed, total, path.name)
+
+        # 同時に動くのは worker_count 件だけなので、タスクもその数だけ作りキューから順に取り出す
+        work_queue: asyncio.Queue[tuple[int, Path] | None] = asyncio.Queue()
+        # 重いページが最後に残って他のワーカーが遊ばないよう、ファイルサイズの大きい順に投入する
+        for index in sorted(render_indices, key=sizes.__getitem__, reverse=True):
+            work_queue.put_nowait((index, path_list[index]))
+        for _ in range(worker_count):
+            work_queue.put_nowait(None)
+
+        # ワーカーとコンテキストは 1 対 1 に固定し、コンテキストの貸し借りを省く
+        async def worker(pooled: _PooledContext) -> None:
+            while True:
+                item = await work_queue.get()
+                if item is None:
+                    break
+                index, path = item
                 try:
-                    rendered = await self._render_with_retries(context, path)
+                    rendered = await self._render_with_retries(pooled.context, path)
                 finally:
-                    context_pool.put_nowait(context)
+                    await self._recycle_context(pooled)
                 results[index] = rendered
-                await notify_progress(path)
-
-            try:
-                await asyncio.gather(*(process(index, path) for index, path in enumerate(path_list)))
-            finally:
-                for context in contexts:
-                    try:
-                        await context.close()
-                    except Exception:
-                        logger.debug("コンテキストクローズ中に例外が発生しました。", exc_info=True)
-                await browser.close()
+                notify_progress(path)
 
+        # TaskGroup はいずれかのワーカーが失敗すると残りを取り消す。呼び出し側には最初の例外をそのまま伝える
+        try:
+            async with asyncio.TaskGroup() as group:
+                for pooled in contexts:
+                    group.create_task(worker(pooled))
+        except ExceptionGroup as errors:
+            raise errors.exceptions[0] from None
+        for index, original_index in duplicates.items():
+            original = results[original_index]
+            if original is None:
+                continue
+            path = path_list[index]
+            results[index] = RenderedPage(
+                source_path=path,
+                final_html=original.final_html,
+                final_url=path.as_uri(),
+                render_mode=original.render_mode,
+                fallback_reason=original.fallback_reason,
+            )
+            notify_progress(path)
         return [page for page in results if page is not None]
 
+    async def _read_many_without_render(
+        self, path_list: list[Path], progress: ProgressCallback | None
+    ) -> list[RenderedPage]:
+        """Playwright を使わずに全ページを読み込みます。"""
+
+        total = len(path_list)
+        # 読み込みと文字コード判定はスレッド (設定によってはプロセス) へ逃がし、並行させる
+        worker_count = self._determine_worker_count(total)
+        semaphore = asyncio.Semaphore(worker_count)
+        read_count = 0
+        log_interval = _progress_log_interval(total)
+
+        async def read(path: Path, pool: ProcessPoolExecutor | None) -> RenderedPage:
+            nonlocal read_count
+            async with semaphore:
+                if pool is not None:
+                    page = await asyncio.get_running_loop().run_in_executor(
+                        pool, _read_plain_page, path, "playwright_unavailable"
+                    )
+                else:
+                    page = await self._read_without_render(path, reason="playwright_unavailable")
+            read_count += 1
+            if progress is not None:
+                progress(read_count, total, path)
+            elif read_count == total or read_count % log_interval == 0:
+                logger.info("Playwright を利用せずに読み込みました (%d/%d): %s", read_count, total, path.name)
+            return page
+
+        if not self._config.plain_read_processes or worker_count <= 1:
+            return list(await asyncio.gather(*(read(path, None) for path in path_list)))
+        # 文字コード判定は GIL を握ったままの CPU 処理なので、プロセスに分けて並列化する
+        with ProcessPoolExecutor(max_workers=worker_count) as pool:
+            return list(await asyncio.gather(*(read(path, pool) for path in path_list)))
+
+    async def _recycle_context(self, pooled: _PooledContext) -> None:
+        """一定数のページを処理したコンテキストを新しいものへ差し替えます。"""
+
+        pooled.uses += 1
+        limit = self._config.pages_per_context
+        if limit <= 0 or pooled.uses < limit or self._browser is None:
+            return
+        try:
+            await pooled.context.close()
+        except Exception:
+            logger.debug("コンテキストクローズ中に例外が発生しました。", exc_info=True)
+        pooled.context = await self._new_context()
+        pooled.uses = 0
+
+    async def _new_context(self) -> BrowserContext:
+        context_options = dict(_DEFAULT_CONTEXT_OPTIONS)
+        if self._config.context_options is not None:
+            context_options.update(self._config.context_options)
+        context = await self._browser.new_context(**context_options)
+        await context.add_init_script(script=_AUTO_EXPAND_SETUP)
+        await context.route(_NETWORK_URL_RE, _abort_route)
+        return context
+
     def _determine_worker_count(self, total: int) -> int:
         requested = self._config.max_concurrency
         if requested is not None and requested > 0:
@@ -211,12 +443,15 @@ class PageRenderer:
         return max(1, min(total, baseline))
 
     async def _render_with_retries(self, context: BrowserContext, path: Path) -> RenderedPage:
-        attempts = max(1, self._config.max_render_attempts)
+        attempts = self._max_attempts
         timeout = self._config.render_timeout
+        # URI とローカルファイルかどうかは試行をまたいで変わらないため、最初に一度だけ求める
+        uri = path.as_uri()
+        is_local = uri.startswith("file:")
         for attempt in range(1, attempts + 1):
-            wait_until = self._resolve_wait_until(path, attempt)
+            wait_until = self._resolve_wait_until(is_local, attempt)
             try:
-                return await self._render_single(context, path, wait_until, timeout)
+                return await self._render_single(context, path, uri, is_local, wait_until, timeout)
             except Exception as error:
                 if not self._is_playwright_timeout(error):
                     raise
@@ -229,7 +464,7 @@ class PageRenderer:
                         attempt,
                         attempts,
                     )
-                    timeout *= max(1.0, self._config.timeout_backoff_factor)
+                    timeout *= self._timeout_backoff
                     await asyncio.sleep(0.2)
                     continue
                 if self._config.allow_plain_fallback:
@@ -238,22 +473,30 @@ class PageRenderer:
                         path.name,
                         wait_until,
                     )
-                    return self._read_without_render(path, reason="playwright_timeout")
+                    return await self._read_without_render(path, reason="playwright_timeout")
                 raise RuntimeError(
                     "Playwright レンダリングに失敗しました。"
                     f" path={path} attempts={attempts}。"
                     " --allow-render-fallback を指定するとローカルHTMLで継続できます。"
                 ) from error
-        return self._read_without_render(path, reason="unknown")
-
-    async def _render_single(self, context: BrowserContext, path: Path, wait_until: str, timeout: float) -> RenderedPage:
-        page = await self._create_page(context, path)
+        return await self._read_without_render(path, reason="unknown")
+
+    async def _render_single(
+        self,
+        context: BrowserContext,
+        path: Path,
+        uri: str,
+        is_local: bool,
+        wait_until: str,
+        timeout: float,
+    ) -> RenderedPage:
+        page = await context.new_page()
         try:
-            await page.goto(path.as_uri(), wait_until=wait_until, timeout=timeout * 1000)
-            await self._auto_expand(page)
-            delay = self._resolve_post_render_delay(path)
+            await page.goto(uri, wait_until=wait_until, timeout=timeout * 1000)
+            expanded = await self._auto_expand(page)
+            delay = self._resolve_post_render_delay(is_local)
             if delay > 0:
-                await page.wait_for_timeout(delay * 1000)
+                await self._settle(page, delay, expanded)
             html = await page.content()
             return RenderedPage(
                 source_path=path,
@@ -264,59 +507,35 @@ class PageRenderer:
         finally:
             await page.close()
 
-    async def _auto_expand(self, page: Page) -> None:
-        """スクロールやボタン操作で動的コンテンツを展開します。"""
-
-        # Scroll behaviour
-        for _ in range(self._config.max_scroll_iterations):
-            await page.evaluate("window.scrollBy(0, document.body.scrollHeight)")
-            await asyncio.sleep(self._config.scroll_pause)
+    async def _auto_expand(self, page: Page) -> int:
+        """スクロールやボタン操作で動的コンテンツを展開し、操作した要素数を返します。"""
 
-        if self._config.auto_expand_candidates:
-            await page.evaluate(_AUTO_EXPAND_HEURISTICS)
+        if self._expand_options is None:
+            return 0
+        clicked = await page.evaluate(_AUTO_EXPAND_CALL, self._expand_options)
+        return clicked if isinstance(clicked, int) else 0
 
-        if self._config.expand_texts:
-            await page.evaluate(_AUTO_EXPAND_BY_TEXT, list(self._config.expand_texts))
+    async def _settle(self, page: Page, delay: float, expanded: int) -> None:
+        """展開後の描画や通信が落ち着くまで、最大 `delay` 秒待ちます。
 
-    def _read_without_render(self, path: Path, reason: str | None = None) -> RenderedPage:
-        html = self._read_local_file(path)
-        return RenderedPage(
-            source_path=path,
-            final_html=html,
-            final_url=path.as_uri(),
-            render_mode="plain",
-            fallback_reason=reason,
-        )
+        networkidle は 500ms の無通信が条件のため、それより短い上限では成立しません。
+        また展開前に一度成立していると即座に返るため、要素を操作した場合も固定時間待ちます。
+        """
 
-    def _read_local_file(self, path: Path) -> str:
-        try:
-            data = path.read_bytes()
-        except OSError:
-            logger.debug("ローカルHTMLの読み込みに失敗しました。utf-8 で復旧を試みます。", exc_info=True)
-            try:
-                return path.read_text(encoding="utf-8", errors="ignore")
-            except Exception:
-                logger.error("ローカルHTMLの読み込みに失敗しました: %s", path, exc_info=True)
-                return ""
-        if not data:
-            return ""
-        encoding = "utf-8"
-        if detect_charset is not None:
-            try:
-                result = detect_charset(data).best()
-            except Exception:
-                logger.debug("文字コード判定に失敗したため UTF-8 を使用します。", exc_info=True)
-                result = None
-            if result is not None and result.encoding:
-                encoding = result.encoding
+        if expanded or delay < _NETWORK_IDLE_WINDOW:
+            await asyncio.sleep(delay)
+            return
         try:
-            return data.decode(encoding, errors="replace")
-        except LookupError:
-            logger.debug("未知のエンコーディング %s のため UTF-8 フォールバックを使用します。", encoding)
-        return data.decode("utf-8", errors="replace")
+            await page.wait_for_load_state("networkidle", timeout=delay * 1000)
+        except Exception as error:
+            if not self._is_playwright_timeout(error):
+                raise
+
+    async def _read_without_render(self, path: Path, reason: str | None = None) -> RenderedPage:
+        return await asyncio.to_thread(_read_plain_page, path, reason)
 
-    def _resolve_wait_until(self, path: Path, attempt: int) -> str:
-        if self._is_local_file(path):
+    def _resolve_wait_until(self, is_local: bool, attempt: int) -> str:
+        if is_local:
             if attempt == 1:
                 return self._config.file_scheme_wait_until or "domcontentloaded"
             return "load"
@@ -324,43 +543,172 @@ class PageRenderer:
             return self._config.wait_until
         return "load"
 
-    def _resolve_post_render_delay(self, path: Path) -> float:
-        if not self._is_local_file(path):
+    def _resolve_post_render_delay(self, is_local: bool) -> float:
+        if not is_local:
             return 0.0
-        return max(0.0, self._config.post_render_delay)
-
-    def _is_local_file(self, path: Path) -> bool:
-        try:
-            return path.as_uri().startswith("file:")
-        except ValueError:
-            return False
+        return self._post_render_delay
 
     def _is_playwright_timeout(self, error: Exception) -> bool:
         name = error.__class__.__name__
         module = getattr(error.__class__, "__module__", "")
         return name == "TimeoutError" and "playwright" in module
 
-    async def _create_page(self, context: BrowserContext, path: Path) -> Page:
-        page = await context.new_page()
-        if self._is_local_file(path):
-            await page.route("**/*", self._build_local_route_handler())
-        return page
 
-    def _build_local_route_handler(self) -> Callable[[Route], Awaitable[None]]:
-        async def handler(route: Route) -> None:
-            url = route.request.url
-            if url.startswith(("file:", "data:", "about:")):
-                await route.continue_()
-            else:
-                await route.abort()
+def _progress_log_interval(total: int) -> int:
+    """進捗ログを出す間隔。全体のおよそ 1% ごとに 1 行とします。"""
+
+    return max(1, total // 100)
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
 
-        return handler
+def _read_plain_page(path: Path, reason: str | None) -> RenderedPage:
+    """レンダリングせずにローカル HTML を読み込みます。プロセスプールからも呼び出されます。"""
+
+    return RenderedPage(
+        source_path=path,
+        final_html=_read_local_file(path),
+        final_url=path.as_uri(),
+        render_mode="plain",
+        fallback_reason=reason,
+    )
+
+
+def _read_local_file(path: Path) -> str:
+    try:
+        data = path.read_bytes()
+    except OSError:
+        logger.debug("ローカルHTMLの読み込みに失敗しました。utf-8 で復旧を試みます。", exc_info=True)
+        try:
+            return path.read_text(encoding="utf-8", errors="ignore")
+        except Exception:
+            logger.error("ローカルHTMLの読み込みに失敗しました: %s", path, exc_info=True)
+            return ""
+    if not data:
+        return ""
+    sniffed = _sniff_encoding(data)
+    encoding = sniffed or _detect_encoding(data) or "utf-8"
+    # 置換が不要な大半のファイルは strict で一度に復号し、失敗したときだけ置換付きでやり直す
+    text = _decode_strict(data, encoding)
+    if text is not None:
+        return text
+    if sniffed is not None:
+        # BOM や meta charset の宣言が誤っている古いページは、判定した文字コードで読み直す
+        detected = _detect_encoding(data)
+        if detected is not None:
+            text = _decode_strict(data, detected)
+            if text is not None:
+                return text
+    try:
+        return data.decode(encoding, errors="replace")
+    except LookupError:
+        logger.debug("未知のエンコーディング %s のため UTF-8 フォールバックを使用します。", encoding)
+    return data.decode("utf-8", errors="replace")
+
+
+def _decode_strict(data: bytes, encoding: str) -> str | None:
+    try:
+        return data.decode(encoding)
+    except (UnicodeDecodeError, LookupError):
+        return None
+
+
+def _detect_encoding(data: bytes) -> str | None:
+    if cchardet_detect is not None:
+        detected = _detect_encoding_with_cchardet(data)
+        if detected is not None:
+            return detected
+    if detect_charset is None:
+        return None
+    try:
+        result = detect_charset(data).best()
+    except Exception:
+        logger.debug("文字コード判定に失敗したため UTF-8 を使用します。", exc_info=True)
+        return None
+    if result is not None and result.encoding:
+        return result.encoding
+    return None
+
+
+def _detect_encoding_with_cchardet(data: bytes) -> str | None:
+    try:
+        result = cchardet_detect(data)
+    except Exception:
+        logger.debug("cchardet による文字コード判定に失敗しました。", exc_info=True)
+        return None
+    encoding = result.get("encoding")
+    confidence = result.get("confidence") or 0.0
+    if not encoding or confidence < _CCHARDET_MIN_CONFIDENCE:
+        return None
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        return None
+    return encoding
+
+
+def _find_duplicate_files(paths: Sequence[Path], sizes: Sequence[int]) -> dict[int, int]:
+    """内容が同一のファイルについて、重複側の位置から最初に現れた位置への対応を返します。
+
+    相対パスで参照するスクリプトや画像はディレクトリごとに解決先が変わるため、
+    同じディレクトリにあるファイル同士だけを比較します。
+    サイズが他と重ならないファイルは読み込まず、同サイズのものだけをハッシュで比較します。
+    """
+
+    by_location: dict[tuple[Path, int], list[int]] = defaultdict(list)
+    for index, size in enumerate(sizes):
+        by_location[(paths[index].parent, size)].append(index)
+    duplicates: dict[int, int] = {}
+    for indices in by_location.values():
+        if len(indices) < 2:
+            continue
+        seen: dict[bytes, int] = {}
+        for index in indices:
+            try:
+                digest = hashlib.blake2b(paths[index].read_bytes(), digest_size=16).digest()
+            except OSError:
+                continue
+            original_index = seen.setdefault(digest, index)
+            if original_index != index:
+                duplicates[index] = original_index
+    return duplicates
+
+
+def _sniff_encoding(data: bytes) -> str | None:
+    """BOM・meta charset・ASCII のみかどうかから、判定器を使わずにエンコーディングを決めます。"""
+
+    for mark, encoding in _BYTE_ORDER_MARKS:
+        if data.startswith(mark):
+            return encoding
+    match = _META_CHARSET_RE.search(data, 0, _META_CHARSET_WINDOW)
+    if match is not None:
+        declared = match.group(1).decode("ascii")
+        try:
+            codec = codecs.lookup(declared)
+        except LookupError:
+            pass
+        else:
+            # meta 要素が ASCII として読めた時点で UTF-16/32 ではありえないため、
+            # HTML 仕様と同様に UTF-8 として扱う (UTF-16 は BOM でのみ判定する)
+            if codec.name.startswith(("utf-16", "utf-32")):
+                return "utf-8"
+            return declared
+    if data.isascii():
+        return "utf-8"
+    return None
 
 
+async def _abort_route(route: Route) -> None:
+    await route.abort()
 
 
 async def render_paths(paths: Iterable[Path], config: RenderConfig, progress: ProgressCallback | None = None) -> list[RenderedPage]:
     """複数パスをまとめてレンダリングするためのヘルパー。"""
 
-    renderer = PageRenderer(config)
-    return await renderer.render_many(paths, progress=progress)
+    async with PageRenderer(config) as renderer:
+        return await renderer.render_many(paths, progress=progress)
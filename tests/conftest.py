@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import dataclasses
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+from site2docs.extraction import ExtractedPage
+
+_PROTOTYPE_PAGE = ExtractedPage(
+    page_id="",
+    url="",
+    file_path=Path("/"),
+    title="",
+    markdown="",
+    headings=(),
+    links=(),
+    captured_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+)
+
+
+@pytest.fixture(scope="session")
+def mk_page() -> Callable[..., ExtractedPage]:
+    """指定したフィールドだけを差し替えた `ExtractedPage` を作る関数を返します。"""
+
+    def build(**fields: Any) -> ExtractedPage:
+        return dataclasses.replace(_PROTOTYPE_PAGE, **fields)
+
+    return build
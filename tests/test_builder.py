@@ -11,7 +11,6 @@ import pytest
 from site2docs import rendering
 from site2docs.builder import ClusterValidationError, Site2DocsBuilder, build_documents
 from site2docs.config import BuildConfig, OutputConfig, QualityConfig
-from site2docs.extraction import ExtractedPage
 from site2docs.rendering import RenderedPage
 from site2docs.graphing import Cluster
 
@@ -111,7 +110,7 @@ def test_discover_html_files_supports_multiple_extensions(tmp_path: Path) -> Non
     assert ignored not in discovered
 
 
-def test_write_outputs_detects_invalid_cluster(tmp_path: Path) -> None:
+def test_write_outputs_detects_invalid_cluster(tmp_path: Path, mk_page) -> None:
     builder = Site2DocsBuilder(
         BuildConfig(
             input_dir=tmp_path / "input",
@@ -122,15 +121,12 @@ def test_write_outputs_detects_invalid_cluster(tmp_path: Path) -> None:
     page_path.parent.mkdir(parents=True, exist_ok=True)
     page_path.write_text("<html></html>", encoding="utf-8")
     pages = [
-        ExtractedPage(
+        mk_page(
             page_id="pg_001",
             url="https://example.com/",
             file_path=page_path,
             title="title",
             markdown="body",
-            headings=[],
-            links=[],
-            captured_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
         )
     ]
     clusters = [
@@ -148,7 +144,9 @@ def test_write_outputs_detects_invalid_cluster(tmp_path: Path) -> None:
     assert exc.value.missing_pages == {"cl_invalid": ("pg_missing",)}
 
 
-def test_extract_rendered_pages_recovers_from_extraction_failure(tmp_path: Path, monkeypatch, caplog) -> None:
+def test_extract_rendered_pages_recovers_from_extraction_failure(
+    tmp_path: Path, monkeypatch, caplog, mk_page
+) -> None:
     caplog.set_level("INFO")
     input_dir = tmp_path / "input"
     input_dir.mkdir()
@@ -187,17 +185,15 @@ def test_extract_rendered_pages_recovers_from_extraction_failure(tmp_path: Path,
         url: str,
         file_path: Path,
         captured_at: datetime,
-    ) -> ExtractedPage:
+    ):
         if page_id.endswith("001"):
             raise RuntimeError("boom")
-        return ExtractedPage(
+        return mk_page(
             page_id=page_id,
             url=url,
             file_path=file_path,
             title="ok",
             markdown=html,
-            headings=[],
-            links=[],
             captured_at=captured_at,
         )
 
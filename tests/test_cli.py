@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import argparse
 from pathlib import Path
 
 import pytest
@@ -7,6 +8,13 @@ import pytest
 from site2docs import cli
 
 
+@pytest.fixture(scope="session")
+def parser() -> argparse.ArgumentParser:
+    """テスト全体で共有する引数パーサー。構築は一度だけ行います。"""
+
+    return cli._build_parser()
+
+
 @pytest.mark.parametrize(
     "options",
     [
@@ -18,7 +26,7 @@ from site2docs import cli
         }
     ],
 )
-def test_cli_collects_extraction_overrides(tmp_path: Path, options: dict[str, str]) -> None:
+def test_cli_collects_extraction_overrides(tmp_path: Path, parser, options: dict[str, str]) -> None:
     input_dir = tmp_path / "input"
     input_dir.mkdir()
     output_dir = tmp_path / "output"
@@ -40,7 +48,7 @@ def test_cli_collects_extraction_overrides(tmp_path: Path, options: dict[str, st
         "--no-readability",
         "--no-semantic-fallback",
     ]
-    args = cli.parse_args(args_list)
+    args = parser.parse_args(args_list)
     overrides = cli._collect_extraction_overrides(args)
 
     assert overrides["min_content_characters"] == int(options["min_content_characters"])
@@ -52,11 +60,11 @@ def test_cli_collects_extraction_overrides(tmp_path: Path, options: dict[str, st
     assert overrides["semantic_body_fallback"] is False
 
 
-def test_cli_collects_graph_overrides(tmp_path: Path) -> None:
+def test_cli_collects_graph_overrides(tmp_path: Path, parser) -> None:
     input_dir = tmp_path / "input"
     input_dir.mkdir()
     output_dir = tmp_path / "output"
-    args = cli.parse_args(
+    args = parser.parse_args(
         [
             "--input",
             str(input_dir),
@@ -85,11 +93,11 @@ def test_cli_collects_graph_overrides(tmp_path: Path) -> None:
     assert overrides["label_tfidf_terms"] == 8
 
 
-def test_cli_collects_quality_overrides(tmp_path: Path) -> None:
+def test_cli_collects_quality_overrides(tmp_path: Path, parser) -> None:
     input_dir = tmp_path / "input"
     input_dir.mkdir()
     output_dir = tmp_path / "output"
-    args = cli.parse_args(
+    args = parser.parse_args(
         [
             "--input",
             str(input_dir),
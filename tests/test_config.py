@@ -1,16 +1,42 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any
+
+import pytest
 
 from site2docs.config import BuildConfig
 
 
-def test_from_args_merges_expand_texts_case_insensitively(tmp_path: Path) -> None:
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        None,
+        {
+            "extraction_overrides": {
+                "min_content_characters": 100,
+                "semantic_body_fallback": False,
+                "max_workers": 5,
+            },
+            "graph_overrides": {
+                "min_cluster_size": 1,
+                "allow_singleton_clusters": True,
+            },
+            "launch_options": {"headless": False},
+            "deduplicate_identical_files": True,
+        },
+    ],
+    ids=["defaults", "with_overrides"],
+)
+def test_from_args_merges_expand_texts_and_applies_overrides(
+    tmp_path: Path, overrides: dict[str, Any] | None
+) -> None:
     output_dir = tmp_path / "output"
     config = BuildConfig.from_args(
         input_dir=tmp_path,
         output_dir=output_dir,
         expand_texts=["Read More", "追加"],
+        **(overrides or {}),
     )
 
     expand_texts = config.render.expand_texts
@@ -18,25 +44,11 @@ def test_from_args_merges_expand_texts_case_insensitively(tmp_path: Path) -> Non
     read_more_variants = [text for text in expand_texts if text.lower() == "read more"]
     assert len(read_more_variants) == 1
     assert "追加" in expand_texts
+    # 同一ファイルの使い回しは明示的に指定したときだけ有効になる
+    assert config.render.deduplicate_identical_files is (overrides is not None)
 
-
-def test_from_args_accepts_extraction_and_graph_overrides(tmp_path: Path) -> None:
-    output_dir = tmp_path / "output"
-    config = BuildConfig.from_args(
-        input_dir=tmp_path,
-        output_dir=output_dir,
-        extraction_overrides={
-            "min_content_characters": 100,
-            "semantic_body_fallback": False,
-            "max_workers": 5,
-        },
-        graph_overrides={
-            "min_cluster_size": 1,
-            "allow_singleton_clusters": True,
-        },
-        launch_options={"headless": False},
-    )
-
+    if overrides is None:
+        return
     assert config.extract.min_content_characters == 100
     assert config.extract.semantic_body_fallback is False
     assert config.extract.max_workers == 5
@@ -1,27 +1,21 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import pytest
 
 from site2docs.document import MissingClusterPageError, build_markdown
-from site2docs.extraction import ExtractedPage
 from site2docs.graphing import Cluster
 
 
-def test_build_markdown_falls_back_to_cluster_id_for_slug(tmp_path: Path) -> None:
-    page_path = tmp_path / "index.html"
-    page_path.write_text("<html></html>", encoding="utf-8")
-    page = ExtractedPage(
+def test_build_markdown_falls_back_to_cluster_id_for_slug(tmp_path: Path, mk_page) -> None:
+    page = mk_page(
         page_id="pg_001",
         url="https://example.com/",
-        file_path=page_path,
+        file_path=tmp_path / "index.html",
         title="タイトル",
         markdown="本文",
-        headings=[],
-        links=[],
-        captured_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
     )
     cluster = Cluster(
         cluster_id="cl_001",
@@ -36,18 +30,13 @@ def test_build_markdown_falls_back_to_cluster_id_for_slug(tmp_path: Path) -> Non
     assert "cluster_slug: cl_001" in markdown
 
 
-def test_build_markdown_raises_for_missing_page(tmp_path: Path) -> None:
-    page_path = tmp_path / "index.html"
-    page_path.write_text("<html></html>", encoding="utf-8")
-    page = ExtractedPage(
+def test_build_markdown_raises_for_missing_page(tmp_path: Path, mk_page) -> None:
+    page = mk_page(
         page_id="pg_001",
         url="https://example.com/",
-        file_path=page_path,
+        file_path=tmp_path / "index.html",
         title="タイトル",
         markdown="本文",
-        headings=[],
-        links=[],
-        captured_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
     )
     cluster = Cluster(
         cluster_id="cl_001",
@@ -60,3 +49,57 @@ def test_build_markdown_raises_for_missing_page(tmp_path: Path) -> None:
         build_markdown(cluster, [page], datetime(2024, 1, 1, tzinfo=timezone.utc))
 
     assert "pg_missing" in str(exc.value)
+
+
+def test_build_markdown_formats_capture_date_per_timezone(tmp_path: Path, mk_page) -> None:
+    captured_at = datetime(2024, 1, 1, 20, tzinfo=timezone.utc)
+    jst = timezone(timedelta(hours=9), "JST")
+    pages = [
+        mk_page(
+            page_id=f"pg_00{idx}",
+            url="https://example.com/",
+            file_path=tmp_path / f"page{idx}.html",
+            title="タイトル",
+            markdown="本文",
+            captured_at=value,
+        )
+        for idx, value in enumerate((captured_at, captured_at, captured_at.astimezone(jst)), start=1)
+    ]
+    cluster = Cluster(
+        cluster_id="cl_001",
+        label="ラベル",
+        slug="cl-001",
+        page_ids=[page.page_id for page in pages],
+    )
+
+    markdown = build_markdown(cluster, pages, captured_at)
+
+    assert markdown.count("> 取得日時: 2024-01-01 UTC") == 2
+    assert "> 取得日時: 2024-01-02 JST" in markdown
+
+
+def test_build_markdown_accepts_prebuilt_page_lookup(tmp_path: Path, mk_page) -> None:
+    pages = [
+        mk_page(
+            page_id=page_id,
+            url=f"https://example.com/{page_id}",
+            file_path=tmp_path / f"{page_id}.html",
+            title=page_id,
+            markdown=f"{page_id} の本文",
+        )
+        for page_id in ("pg_001", "pg_002", "pg_003")
+    ]
+    lookup = {page.page_id: page for page in pages}
+    cluster = Cluster(
+        cluster_id="cl_001",
+        label="ラベル",
+        slug="cl-001",
+        page_ids=["pg_003", "pg_001"],
+    )
+
+    markdown = build_markdown(
+        cluster, (), datetime(2024, 1, 1, tzinfo=timezone.utc), page_lookup=lookup
+    )
+
+    assert markdown.index("## pg_003") < markdown.index("## pg_001")
+    assert "## pg_002" not in markdown
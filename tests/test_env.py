@@ -2,20 +2,31 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
+from typing import Callable, Mapping
+
+import pytest
 
 from site2docs import env
 
 
+@pytest.fixture
+def envvars(monkeypatch: pytest.MonkeyPatch) -> Callable[[Mapping[str, str]], None]:
+    """複数の環境変数をまとめて設定し、テスト終了時に元へ戻します。"""
+
+    def apply(mapping: Mapping[str, str]) -> None:
+        for key, value in mapping.items():
+            monkeypatch.setenv(key, value)
+
+    return apply
+
+
 def test_load_env_file_populates_missing_variables(tmp_path: Path, monkeypatch) -> None:
     env_path = tmp_path / ".env"
-    env_path.write_text(
-        """
-        # comment
-        SITE2DOCS_API_KEY=sk-test
-        SITE2DOCS_MODEL="gpt-example"
-        OPENAI_MODEL=gpt-ignored
-        """,
-        encoding="utf-8",
+    env_path.write_bytes(
+        b"# comment\n"
+        b"SITE2DOCS_API_KEY=sk-test\n"
+        b'SITE2DOCS_MODEL="gpt-example"\n'
+        b"OPENAI_MODEL=gpt-ignored\n"
     )
     monkeypatch.delenv("SITE2DOCS_API_KEY", raising=False)
     monkeypatch.delenv("SITE2DOCS_MODEL", raising=False)
@@ -30,13 +41,56 @@ def test_load_env_file_populates_missing_variables(tmp_path: Path, monkeypatch)
     assert os.environ["OPENAI_MODEL"] == "preserve"
 
 
-def test_current_llm_settings_prefers_site2docs_vars(monkeypatch) -> None:
-    monkeypatch.setenv("SITE2DOCS_API_KEY", "sk-site")
-    monkeypatch.setenv("SITE2DOCS_MODEL", "gpt-site")
-    monkeypatch.setenv("OPENAI_API_KEY", "sk-openai")
-    monkeypatch.setenv("OPENAI_MODEL", "gpt-openai")
+def test_current_llm_settings_prefers_site2docs_vars(envvars) -> None:
+    envvars(
+        {
+            "SITE2DOCS_API_KEY": "sk-site",
+            "SITE2DOCS_MODEL": "gpt-site",
+            "OPENAI_API_KEY": "sk-openai",
+            "OPENAI_MODEL": "gpt-openai",
+        }
+    )
 
     settings = env.current_llm_settings()
 
     assert settings.api_key == "sk-site"
     assert settings.model == "gpt-site"
+
+
+def test_load_env_file_reuses_cache_until_file_changes(tmp_path: Path, monkeypatch) -> None:
+    env_path = tmp_path / ".env"
+    env_path.write_text("SITE2DOCS_MODEL=first\n", encoding="utf-8")
+    monkeypatch.delenv("SITE2DOCS_MODEL", raising=False)
+
+    assert env.load_env_file(env_path) == {"SITE2DOCS_MODEL": "first"}
+    monkeypatch.delenv("SITE2DOCS_MODEL", raising=False)
+    # キャッシュ利用時も未設定の環境変数は補完される
+    assert env.load_env_file(env_path) == {"SITE2DOCS_MODEL": "first"}
+    assert os.environ["SITE2DOCS_MODEL"] == "first"
+
+    env_path.write_text("SITE2DOCS_MODEL=second\n", encoding="utf-8")
+    stat = env_path.stat()
+    os.utime(env_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert env.load_env_file(env_path) == {"SITE2DOCS_MODEL": "second"}
+
+
+def test_load_env_file_strips_quotes_and_skips_invalid_keys(tmp_path: Path, monkeypatch) -> None:
+    env_path = tmp_path / ".env"
+    env_path.write_text(
+        "SITE2DOCS_TEST_SINGLE = 'single value'\n"
+        "SITE2DOCS_TEST_EMPTY=\"\"\n"
+        "SITE2DOCS_TEST_BARE=a=b\n"
+        "INVALID KEY=ignored\n",
+        encoding="utf-8",
+    )
+    for key in ("SITE2DOCS_TEST_SINGLE", "SITE2DOCS_TEST_EMPTY", "SITE2DOCS_TEST_BARE"):
+        monkeypatch.delenv(key, raising=False)
+
+    loaded = env.load_env_file(env_path)
+
+    assert loaded == {
+        "SITE2DOCS_TEST_SINGLE": "single value",
+        "SITE2DOCS_TEST_EMPTY": "",
+        "SITE2DOCS_TEST_BARE": "a=b",
+    }
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 import logging
+import re
 from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
 
-from site2docs.extraction import ContentExtractor, ExtractionConfig
+from site2docs import extraction
+from site2docs.extraction import ContentExtractor, ExtractionConfig, _longest_text_block, extract_contents
+
+
+_NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
 
 
 def test_extract_normalizes_links(tmp_path: Path) -> None:
@@ -29,7 +34,7 @@ def test_extract_normalizes_links(tmp_path: Path) -> None:
         html,
         url="https://example.com/base/index.html#fragment",
         file_path=file_path,
-        captured_at=datetime.now(timezone.utc),
+        captured_at=_NOW,
     )
 
     assert page.url == "https://example.com/base/index.html"
@@ -58,7 +63,7 @@ def test_extract_raises_when_fallback_disabled(tmp_path: Path) -> None:
             html,
             url="",
             file_path=file_path,
-            captured_at=datetime.now(timezone.utc),
+            captured_at=_NOW,
         )
 
 
@@ -82,8 +87,6 @@ def test_extract_uses_semantic_body_when_readability_is_too_small(tmp_path: Path
     file_path = tmp_path / "index.html"
     file_path.write_text(html, encoding="utf-8")
 
-    from site2docs import extraction
-
     class DummyDocument:
         def __init__(self, _: str) -> None:
             pass
@@ -95,6 +98,7 @@ def test_extract_uses_semantic_body_when_readability_is_too_small(tmp_path: Path
             return "<p>短い要約のみ</p>"
 
     monkeypatch.setattr(extraction, "Document", DummyDocument)
+    monkeypatch.setattr(extraction, "TrafilaturaReadability", None)
     monkeypatch.setattr(extraction, "trafilatura", None)
 
     extractor = ContentExtractor(ExtractionConfig())
@@ -103,21 +107,23 @@ def test_extract_uses_semantic_body_when_readability_is_too_small(tmp_path: Path
         html,
         url="https://example.com/page",
         file_path=file_path,
-        captured_at=datetime.now(timezone.utc),
+        captured_at=_NOW,
     )
 
     assert "本来拾いたい本文" in page.markdown
     assert "重要な情報" in page.markdown
 
 
-def test_content_extractor_warns_when_optional_dependencies_missing(monkeypatch, caplog) -> None:
-    from site2docs import extraction
+@pytest.fixture
+def no_optional_deps(monkeypatch: pytest.MonkeyPatch) -> pytest.MonkeyPatch:
+    """抽出モジュールの任意依存をすべて未導入の状態にします。"""
+
+    for name in ("Document", "TrafilaturaReadability", "trafilatura", "html_to_markdown"):
+        monkeypatch.setattr(extraction, name, None)
+    return monkeypatch
 
-    monkeypatch.setattr(extraction, "Document", None)
-    monkeypatch.setattr(extraction, "trafilatura", None)
-    monkeypatch.setattr(extraction, "BeautifulSoup", None)
-    monkeypatch.setattr(extraction, "html_to_markdown", None)
 
+def test_content_extractor_warns_when_optional_dependencies_missing(no_optional_deps, caplog) -> None:
     caplog.set_level(logging.WARNING)
 
     ContentExtractor(
@@ -129,8 +135,198 @@ def test_content_extractor_warns_when_optional_dependencies_missing(monkeypatch,
         )
     )
 
-    messages = [record.message for record in caplog.records if record.levelno >= logging.WARNING]
-    assert any("Readability" in message for message in messages)
-    assert any("Trafilatura" in message for message in messages)
-    assert any("BeautifulSoup" in message for message in messages)
-    assert any("markdownify" in message for message in messages)
+    pattern = re.compile(r"Readability|Trafilatura|markdownify")
+    matched = {
+        match.group()
+        for record in caplog.records
+        if record.levelno >= logging.WARNING
+        for match in pattern.finditer(record.message)
+    }
+    assert matched >= {"Readability", "Trafilatura", "markdownify"}
+
+
+def test_content_extractor_converts_markdown_without_markdownify(monkeypatch) -> None:
+    monkeypatch.setattr(extraction, "html_to_markdown", None)
+    extractor = ContentExtractor(ExtractionConfig())
+
+    markdown = extractor._convert_to_markdown(
+        "<h2>手順</h2><p>詳細は <a href='/docs'>ドキュメント</a> を参照</p>"
+        "<ul><li>準備</li><li>実行</li></ul><pre>make build</pre>"
+    )
+
+    assert markdown == (
+        "## 手順\n\n詳細は [ドキュメント](/docs) を参照\n\n- 準備\n- 実行\n\n```\nmake build\n```"
+    )
+
+
+def test_fast_markdown_quotes_blocks_and_escapes_emphasis_characters() -> None:
+    extractor = ContentExtractor(ExtractionConfig(fast_markdown=True))
+
+    markdown = extractor._convert_to_markdown(
+        "<blockquote><p>引用</p><p>続き</p></blockquote>"
+        "<p>*star* _u_ <b> bold </b><code>a_b</code></p>"
+    )
+
+    assert markdown == "> 引用\n>\n> 続き\n\n\\*star\\* \\_u\\_ **bold** `a_b`"
+
+
+def test_parse_html_drops_comments_and_reuses_parser() -> None:
+    extractor = ContentExtractor(ExtractionConfig())
+
+    first = extractor._parse_html("<html><body><p>前<!-- 管理用コメント -->後</p></body></html>")
+    second = extractor._parse_html("<html><body><p>別ページ</p></body></html>")
+
+    assert first is not None and second is not None
+    assert first.xpath("//comment()") == []
+    assert first.findtext(".//p") == "前後"
+    assert second.findtext(".//p") == "別ページ"
+
+
+def test_document_title_normalizes_whitespace() -> None:
+    extractor = ContentExtractor(ExtractionConfig())
+    tree = extractor._parse_html("<html><head><title>\n  製品\n  ガイド  </title></head><body></body></html>")
+    empty = extractor._parse_html("<html><body><p>本文</p></body></html>")
+
+    assert extractor._document_title(tree) == "製品 ガイド"
+    assert extractor._document_title(empty) == ""
+
+
+def test_longest_text_block_matches_visible_text_length() -> None:
+    extractor = ContentExtractor(ExtractionConfig())
+    tree = extractor._parse_html(
+        """
+        <html><body>
+          <div id="outer"><section id="short"><p>短い</p></section><script>ignored()</script></div>
+          <section id="long"><p>こちらの段落はより長い本文です</p><div><p>補足</p></div></section>
+        </body></html>
+        """
+    )
+
+    best = _longest_text_block(tree.find("body"))
+
+    assert best is not None
+    assert best.get("id") == "long"
+
+
+def test_count_plain_text_reuses_recent_result_and_skips_plain_text(monkeypatch) -> None:
+    extractor = ContentExtractor(ExtractionConfig())
+    parse_calls: list[str] = []
+    original_parse = extractor._parse_html
+
+    def recording_parse(html: str):
+        parse_calls.append(html)
+        return original_parse(html)
+
+    monkeypatch.setattr(extractor, "_parse_html", recording_parse)
+    summary = "<div><p>本文です</p><p>続き</p></div>"
+
+    assert extractor._count_plain_text(summary) == len("本文です 続き")
+    assert extractor._count_plain_text(summary) == len("本文です 続き")
+    assert extractor._count_plain_text("  プレーンテキスト  ") == len("プレーンテキスト")
+    assert parse_calls == [summary]
+
+
+def test_extract_contents_returns_pages_unchanged(mk_page) -> None:
+    pages = [mk_page(page_id="pg_001"), mk_page(page_id="pg_002")]
+
+    assert extract_contents(iter(pages)) == pages
+
+
+def test_extract_uses_canonical_link_for_local_files(tmp_path: Path) -> None:
+    html = """
+    <html>
+      <head>
+        <title>Canonical</title>
+        <link rel="stylesheet" href="/style.css">
+        <link rel="Canonical" href="/docs/canonical.html#top">
+      </head>
+      <body><a href="other.html">other</a></body>
+    </html>
+    """
+    file_path = tmp_path / "site_backup" / "example.com" / "docs" / "index.html"
+
+    extractor = ContentExtractor(ExtractionConfig())
+    page = extractor.extract(
+        "pg_001",
+        html,
+        url=file_path.as_uri(),
+        file_path=file_path,
+        captured_at=_NOW,
+    )
+
+    assert page.url == "https://example.com/docs/canonical.html"
+    assert page.links == ("https://example.com/docs/other.html",)
+
+
+def test_canonical_url_prefers_head_metadata_over_body_links() -> None:
+    extractor = ContentExtractor(ExtractionConfig())
+    tree = extractor._parse_html(
+        """
+        <html>
+          <head><meta property="og:url" content="https://example.com/from-head"></head>
+          <body><link rel="canonical" href="https://example.com/from-body"></body>
+        </html>
+        """
+    )
+    fallback = extractor._parse_html(
+        "<html><body><link rel='canonical' href='/from-body'></body></html>"
+    )
+
+    assert extractor._canonical_url_from_html(tree, "example.com") == "https://example.com/from-head"
+    assert extractor._canonical_url_from_html(fallback, "example.com") == "https://example.com/from-body"
+
+
+@pytest.mark.parametrize("use_lexbor", [True, False])
+def test_extract_headings_follow_document_order(tmp_path: Path, monkeypatch, use_lexbor: bool) -> None:
+    if not use_lexbor:
+        monkeypatch.setattr(extraction, "LexborHTMLParser", None)
+    elif extraction.LexborHTMLParser is None:
+        pytest.skip("selectolax が未インストールです")
+    html = """
+    <html><body>
+      <h2>概要</h2><p>本文</p>
+      <h1>タイトル</h1>
+      <h3>詳細</h3><h4>対象外</h4>
+    </body></html>
+    """
+    extractor = ContentExtractor(ExtractionConfig(readability=False, trafilatura=False))
+    page = extractor.extract(
+        "pg_001",
+        html,
+        url="https://example.com/",
+        file_path=tmp_path / "index.html",
+        captured_at=_NOW,
+    )
+
+    assert page.headings == ("概要", "タイトル", "詳細")
+
+
+def test_extract_skips_readable_extractors_for_thin_pages(tmp_path: Path, monkeypatch) -> None:
+    calls: list[str] = []
+
+    class RecordingDocument:
+        def __init__(self, html: str) -> None:
+            calls.append(html)
+
+        def short_title(self) -> str:
+            return ""
+
+        def summary(self, html_partial: bool = True) -> str:  # noqa: ARG002
+            return ""
+
+    monkeypatch.setattr(extraction, "Document", RecordingDocument)
+    monkeypatch.setattr(extraction, "TrafilaturaReadability", None)
+    monkeypatch.setattr(extraction, "trafilatura", None)
+
+    extractor = ContentExtractor(ExtractionConfig(min_content_characters=400))
+    page = extractor.extract(
+        "pg_001",
+        "<html><head><title>薄いページ</title></head><body><p>ページが見つかりません</p></body></html>",
+        url="https://example.com/404",
+        file_path=tmp_path / "404.html",
+        captured_at=_NOW,
+    )
+
+    assert calls == []
+    assert page.title == "薄いページ"
+    assert "ページが見つかりません" in page.markdown
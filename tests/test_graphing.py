@@ -1,32 +1,26 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
 from pathlib import Path
-from urllib.parse import urlparse
 
-from site2docs.graphing import GraphConfig, SiteGraph
-from site2docs.extraction import ExtractedPage
+import pytest
 
+from site2docs import graphing
+from site2docs.graphing import GraphConfig, SiteGraph, _slugify_label, slugify
 
-def test_cluster_slug_uniqueness(tmp_path: Path) -> None:
+
+def test_cluster_slug_uniqueness(tmp_path: Path, mk_page) -> None:
     pages = []
     for idx, directory in enumerate(("group1", "group2"), start=1):
         dir_path = tmp_path / directory
-        dir_path.mkdir()
         for inner in range(2):
             page_id = f"pg_{idx}{inner}"
             file_path = dir_path / f"page{inner}.html"
-            file_path.write_text("<html></html>", encoding="utf-8")
             pages.append(
-                ExtractedPage(
+                mk_page(
                     page_id=page_id,
                     url=f"https://example.com/{directory}/{inner}",
                     file_path=file_path,
-                    title="",
                     markdown="共有 ラベル コンテンツ",
-                    headings=[],
-                    links=[],
-                    captured_at=datetime.now(timezone.utc),
                 )
             )
 
@@ -35,7 +29,11 @@ def test_cluster_slug_uniqueness(tmp_path: Path) -> None:
     def constant_label(_: list[str]) -> str:
         return "共有ラベル"
 
+    def unused_batch(_: object) -> list[str]:
+        raise AssertionError("ラベル推定を差し替えた場合は TF-IDF の一括推定を行わない")
+
     graph._infer_label = constant_label  # type: ignore[assignment]
+    graph._infer_labels_from_text = unused_batch  # type: ignore[assignment]
 
     clusters = graph.cluster(pages)
 
@@ -47,28 +45,18 @@ def test_cluster_slug_uniqueness(tmp_path: Path) -> None:
     assert len(cluster_ids) == 2
 
 
-def test_cluster_by_url_pattern(tmp_path: Path) -> None:
+def test_cluster_by_url_pattern(tmp_path: Path, mk_page) -> None:
     base_dir = tmp_path / "pages"
-    base_dir.mkdir()
-
-    def create_page(page_id: str, url: str) -> ExtractedPage:
-        parsed = urlparse(url)
-        segments = [segment for segment in parsed.path.split("/") if segment]
-        directory = base_dir
-        if segments:
-            directory = base_dir / Path(*segments[:-1]) if len(segments) > 1 else base_dir
-        directory.mkdir(parents=True, exist_ok=True)
-        file_path = directory / f"{page_id}.html"
-        file_path.write_text("<html></html>", encoding="utf-8")
-        return ExtractedPage(
+
+    def create_page(page_id: str, url: str):
+        # "https://host/a/b/c" の分割結果は ["https:", "", "host", "a", "b", "c"] になる
+        directory_segments = url.split("/")[3:-1]
+        file_path = base_dir.joinpath(*directory_segments, f"{page_id}.html")
+        return mk_page(
             page_id=page_id,
             url=url,
             file_path=file_path,
-            title="",
             markdown="テスト コンテンツ",
-            headings=[],
-            links=[],
-            captured_at=datetime.now(timezone.utc),
         )
 
     pages = [
@@ -79,7 +67,6 @@ def test_cluster_by_url_pattern(tmp_path: Path) -> None:
     ]
 
     graph = SiteGraph(GraphConfig(min_cluster_size=2, url_pattern_depth=3))
-
     clusters = graph.cluster(pages)
 
     cluster_sets = [set(cluster.page_ids) for cluster in clusters]
@@ -89,23 +76,14 @@ def test_cluster_by_url_pattern(tmp_path: Path) -> None:
     assert aggregated == sorted(page.page_id for page in pages)
 
 
-def test_cluster_label_uses_url_prefix_when_text_sparse(tmp_path: Path) -> None:
-    pages: list[ExtractedPage] = []
-    base_dir = tmp_path / "cluster"
-    base_dir.mkdir()
+def test_cluster_label_uses_url_prefix_when_text_sparse(tmp_path: Path, mk_page) -> None:
+    pages = []
     for idx in range(2):
-        file_path = base_dir / f"page{idx}.html"
-        file_path.write_text("<html></html>", encoding="utf-8")
         pages.append(
-            ExtractedPage(
+            mk_page(
                 page_id=f"pg_label_{idx}",
                 url=f"https://example.com/docs/tutorial/{idx}",
-                file_path=file_path,
-                title="",
-                markdown="",
-                headings=[],
-                links=[],
-                captured_at=datetime.now(timezone.utc),
+                file_path=tmp_path / f"page{idx}.html",
             )
         )
 
@@ -117,25 +95,16 @@ def test_cluster_label_uses_url_prefix_when_text_sparse(tmp_path: Path) -> None:
     assert "example.com/docs/tutorial" in target.label
 
 
-def test_directory_grouping_clusters_pages_without_url_overlap(tmp_path: Path) -> None:
+def test_directory_grouping_clusters_pages_without_url_overlap(tmp_path: Path, mk_page) -> None:
     base_dir = tmp_path / "site_backup" / "example.com"
-    (base_dir / "service" / "alpha").mkdir(parents=True)
-    (base_dir / "service" / "beta").mkdir(parents=True)
-
     pages = []
     for idx, name in enumerate(("alpha", "beta"), start=1):
         file_path = base_dir / "service" / name / "index.html"
-        file_path.write_text("<html></html>", encoding="utf-8")
         pages.append(
-            ExtractedPage(
+            mk_page(
                 page_id=f"pg_dir_{idx}",
                 url=file_path.as_uri(),  # URL パターンが使えないケースを再現
                 file_path=file_path,
-                title="",
-                markdown="",
-                headings=[],
-                links=[],
-                captured_at=datetime.now(timezone.utc),
             )
         )
 
@@ -145,25 +114,16 @@ def test_directory_grouping_clusters_pages_without_url_overlap(tmp_path: Path) -
     assert any(set(cluster.page_ids) == {"pg_dir_1", "pg_dir_2"} for cluster in clusters)
 
 
-def test_singletons_are_merged_by_host(tmp_path: Path) -> None:
+def test_singletons_are_merged_by_host(tmp_path: Path, mk_page) -> None:
     base_dir = tmp_path / "site_backup" / "sample.com"
-    for idx in range(3):
-        path = base_dir / f"landing{idx}" / "index.html"
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text("<html></html>", encoding="utf-8")
     pages = []
     for idx in range(3):
         file_path = base_dir / f"landing{idx}" / "index.html"
         pages.append(
-            ExtractedPage(
+            mk_page(
                 page_id=f"pg_single_{idx}",
                 url=f"https://sample.com/landing{idx}/",
                 file_path=file_path,
-                title="",
-                markdown="",
-                headings=[],
-                links=[],
-                captured_at=datetime.now(timezone.utc),
             )
         )
 
@@ -173,23 +133,17 @@ def test_singletons_are_merged_by_host(tmp_path: Path) -> None:
     assert any(len(cluster.page_ids) == 3 for cluster in clusters)
 
 
-def test_label_generation_handles_japanese_text(tmp_path: Path) -> None:
+def test_label_generation_handles_japanese_text(tmp_path: Path, mk_page) -> None:
     base_dir = tmp_path / "site_backup" / "jp.example.com" / "docs"
-    base_dir.mkdir(parents=True)
-    pages: list[ExtractedPage] = []
+    pages = []
     for idx in range(2):
         file_path = base_dir / f"page{idx}.html"
-        file_path.write_text("<html></html>", encoding="utf-8")
         pages.append(
-            ExtractedPage(
+            mk_page(
                 page_id=f"pg_jp_{idx}",
                 url=f"https://jp.example.com/docs/{idx}",
                 file_path=file_path,
-                title="",
                 markdown="製品概要 セキュリティ 解説 製品概要 詳細",
-                headings=[],
-                links=[],
-                captured_at=datetime.now(timezone.utc),
             )
         )
 
@@ -199,3 +153,122 @@ def test_label_generation_handles_japanese_text(tmp_path: Path) -> None:
     assert clusters, "クラスタが生成されていません"
     target = next(cluster for cluster in clusters if set(cluster.page_ids) == {"pg_jp_0", "pg_jp_1"})
     assert "製品概要" in target.label or "セキュリティ" in target.label
+
+
+@pytest.mark.parametrize("backend", ["igraph", "networkx"])
+def test_community_detection_backends_split_linked_groups(monkeypatch, backend: str) -> None:
+    if backend == "networkx":
+        if graphing._load_networkx() is None:
+            pytest.skip("networkx が未インストールです")
+        monkeypatch.setattr(graphing, "_load_igraph", lambda: None)
+    elif graphing._load_igraph() is None:
+        pytest.skip("igraph が未インストールです")
+
+    node_ids = [f"a{idx}" for idx in range(4)] + [f"b{idx}" for idx in range(4)]
+    edges = [
+        (source, target)
+        for offset in (0, 4)
+        for source in range(offset, offset + 4)
+        for target in range(source + 1, offset + 4)
+    ]
+    edges.append((0, 4))
+
+    groups = SiteGraph(GraphConfig(min_cluster_size=2))._cluster_with_networkx(node_ids, edges)
+
+    assert sorted(sorted(group) for group in groups) == [
+        ["a0", "a1", "a2", "a3"],
+        ["b0", "b1", "b2", "b3"],
+    ]
+
+
+def test_build_adjacency_returns_deduplicated_edge_list(tmp_path: Path, mk_page) -> None:
+    def page(page_id: str, url: str, links: tuple[str, ...]):
+        return mk_page(
+            page_id=page_id,
+            url=url,
+            file_path=tmp_path / f"{page_id}.html",
+            links=links,
+        )
+
+    pages = [
+        page("pg_a", "https://example.com/a", ("https://example.com/c", "https://example.com/a")),
+        page("pg_b", "https://example.com/b", ("https://other.example.com/",)),
+        page("pg_c", "https://example.com/c", ("https://example.com/a",)),
+    ]
+
+    node_ids, edges = SiteGraph(GraphConfig())._build_adjacency(pages)
+
+    assert node_ids == ["pg_a", "pg_c"]
+    assert edges == [(0, 1)]
+
+
+def test_url_pattern_clustering_stops_once_all_pages_share_a_pattern(tmp_path: Path, mk_page) -> None:
+    pages = [
+        mk_page(
+            page_id=f"pg_{idx}",
+            url=f"https://example.com/docs/{idx}",
+            file_path=tmp_path / f"{idx}.html",
+        )
+        for idx in range(2)
+    ]
+    graph = SiteGraph(GraphConfig(min_cluster_size=3, url_pattern_depth=4))
+    depths: list[int] = []
+    original = graph._url_pattern_buckets
+
+    def recording_buckets(pages, depth, url_parts):
+        depths.append(depth)
+        return original(pages, depth, url_parts)
+
+    graph._url_pattern_buckets = recording_buckets  # type: ignore[assignment]
+
+    groups, _ = graph._cluster_by_url_pattern(pages)
+
+    assert groups == []
+    assert depths == [4]
+
+
+def test_link_components_are_used_without_community_libraries(monkeypatch) -> None:
+    monkeypatch.setattr(graphing, "_load_igraph", lambda: None)
+    monkeypatch.setattr(graphing, "_load_networkx", lambda: None)
+    node_ids = ["a", "b", "c", "d", "e"]
+    edges = [(0, 1), (1, 2), (3, 4)]
+
+    groups = SiteGraph(GraphConfig(min_cluster_size=3))._cluster_with_networkx(node_ids, edges)
+
+    assert groups == [{"a", "b", "c"}]
+
+
+def test_batched_text_labels_match_per_cluster_labels(tmp_path: Path, mk_page) -> None:
+    def make_page(page_id: str, markdown: str):
+        return mk_page(
+            page_id=page_id,
+            url=f"https://example.com/{page_id}",
+            file_path=tmp_path / f"{page_id}.html",
+            markdown=markdown,
+        )
+
+    groups = [
+        [
+            make_page("en_0", "install guide python install api"),
+            make_page("en_1", "python api reference and install"),
+        ],
+        [make_page("ja_0", "製品概要 セキュリティ 解説 製品概要 詳細")],
+        [make_page("stop_0", "the and of")],
+        [make_page("empty_0", "   ")],
+    ]
+    graph = SiteGraph(GraphConfig(label_tfidf_terms=3))
+
+    batched = graph._infer_labels_from_text(groups)
+
+    assert batched == [graph._infer_labels_from_text([pages])[0] for pages in groups]
+    assert batched[0].split()[0] == "install"
+    assert batched[2] == "the and of"
+    assert batched[3] == ""
+
+
+@pytest.mark.parametrize(
+    "label",
+    ["example.com/docs/guide", "API Reference v2.0", "--under_score--", "製品概要 セキュリティ"],
+)
+def test_slugify_label_matches_slugify(label: str) -> None:
+    assert _slugify_label(label) == slugify(label)
@@ -1,42 +1,66 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from pathlib import Path
+import pytest
 
+from site2docs import quality
 from site2docs.config import QualityConfig
-from site2docs.extraction import ExtractedPage
 from site2docs.graphing import Cluster
 from site2docs.quality import HallucinationGuard
 
 
-def _page(page_id: str, markdown: str, url: str = "https://example.com/") -> ExtractedPage:
-    return ExtractedPage(
-        page_id=page_id,
-        url=url,
-        file_path=Path(f"/tmp/{page_id}.html"),
-        title="title",
-        markdown=markdown,
-        headings=[],
-        links=[],
-        captured_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
-    )
-
-
-def test_guard_detects_short_content() -> None:
+def test_guard_detects_short_content(mk_page) -> None:
     guard = HallucinationGuard(QualityConfig(min_page_characters=50))
     cluster = Cluster(cluster_id="cl_test", label="Alpha", slug="alpha", page_ids=["pg_001"])
-    pages = [_page("pg_001", "short text")]
+    pages = [mk_page(page_id="pg_001", url="https://example.com/", markdown="short text")]
 
     report = guard.inspect([cluster], {cluster.cluster_id: pages})
 
     assert any(f.kind == "insufficient_content" for f in report.findings)
 
 
-def test_guard_flags_label_mismatch() -> None:
+def test_guard_flags_label_mismatch(mk_page) -> None:
     guard = HallucinationGuard(QualityConfig(label_min_token_length=4))
     cluster = Cluster(cluster_id="cl_test", label="Secret Feature", slug="secret", page_ids=["pg_001"])
-    pages = [_page("pg_001", "これは公開済みの概要です。")]
+    pages = [mk_page(page_id="pg_001", url="https://example.com/", markdown="これは公開済みの概要です。")]
 
     report = guard.inspect([cluster], {cluster.cluster_id: pages})
 
     assert any(f.kind == "label_not_in_content" for f in report.findings)
+
+
+@pytest.mark.parametrize("use_automaton", [True, False])
+def test_label_grounding_reports_only_missing_tokens(monkeypatch, mk_page, use_automaton: bool) -> None:
+    if not use_automaton:
+        monkeypatch.setattr(quality, "ahocorasick", None)
+    elif quality.ahocorasick is None:
+        pytest.skip("pyahocorasick が未インストールです")
+
+    guard = HallucinationGuard(QualityConfig(label_min_token_length=4))
+    cluster = Cluster(cluster_id="cl_test", label="Release Notes Roadmap", slug="release", page_ids=["pg_001"])
+    pages = [
+        mk_page(page_id="pg_001", url="https://example.com/", markdown="Release schedule for this year."),
+        mk_page(page_id="pg_002", url="https://example.com/", markdown="Detailed NOTES for each version."),
+    ]
+
+    report = guard.inspect([cluster], {cluster.cluster_id: pages})
+
+    messages = [f.message for f in report.findings if f.kind == "label_not_in_content"]
+    assert len(messages) == 1
+    assert "'roadmap'" in messages[0]
+
+
+def test_summary_grounding_flags_snippets_missing_from_shared_page(monkeypatch, mk_page) -> None:
+    def fabricated_snippets(pages, limit):  # noqa: ARG001
+        return [(page.page_id, "存在しない要約文") for page in pages][:limit]
+
+    monkeypatch.setattr(quality, "build_summary_snippets", fabricated_snippets)
+    guard = HallucinationGuard(QualityConfig())
+    shared = mk_page(page_id="pg_001", url="https://example.com/", markdown="実際の本文です。")
+    clusters = [
+        Cluster(cluster_id=f"cl_{idx}", label="", slug=f"c{idx}", page_ids=["pg_001"]) for idx in range(2)
+    ]
+
+    report = guard.inspect(clusters, {cluster.cluster_id: [shared] for cluster in clusters})
+
+    flagged = [f.cluster_id for f in report.findings if f.kind == "summary_not_in_source"]
+    assert flagged == ["cl_0", "cl_1"]
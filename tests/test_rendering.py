@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from site2docs import rendering
+from site2docs.config import RenderConfig
+from site2docs.rendering import PageRenderer
+
+
+class FakePage:
+    def __init__(self, context: "FakeContext") -> None:
+        self._context = context
+        self.url = ""
+
+    async def goto(self, url: str, wait_until: str, timeout: float) -> None:
+        self.url = url
+        self._context.visited.append(url)
+
+    async def evaluate(self, script: str, arg=None):
+        self._context.evaluations.append(script)
+        return 0
+
+    async def wait_for_load_state(self, state: str, timeout: float) -> None:
+        self._context.load_states.append(state)
+
+    async def content(self) -> str:
+        return f"<html><body>{self.url}</body></html>"
+
+    async def close(self) -> None:
+        return None
+
+
+class FakeContext:
+    def __init__(self, browser: "FakeBrowser", options: dict) -> None:
+        self._browser = browser
+        self.options = options
+        self.closed = False
+        self.visited: list[str] = []
+        self.evaluations: list[str] = []
+        self.routes: list[object] = []
+        self.load_states: list[str] = []
+        self.init_scripts: list[str] = []
+
+    async def add_init_script(self, script: str) -> None:
+        self.init_scripts.append(script)
+
+    async def route(self, pattern, handler) -> None:
+        self.routes.append(pattern)
+
+    async def new_page(self) -> FakePage:
+        return FakePage(self)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.contexts: list[FakeContext] = []
+        self.closed = False
+
+    async def new_context(self, **kwargs) -> FakeContext:
+        context = FakeContext(self, kwargs)
+        self.contexts.append(context)
+        return context
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeChromium:
+    def __init__(self, owner: "FakePlaywright") -> None:
+        self._owner = owner
+
+    async def launch(self, **kwargs) -> FakeBrowser:
+        browser = FakeBrowser()
+        self._owner.browsers.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self) -> None:
+        self.browsers: list[FakeBrowser] = []
+        self.chromium = FakeChromium(self)
+        self.stopped = False
+
+    async def start(self) -> FakePlaywright:
+        return self
+
+    async def stop(self) -> None:
+        self.stopped = True
+
+
+class SlowTimeoutError(Exception):
+    pass
+
+
+SlowTimeoutError.__name__ = "TimeoutError"
+SlowTimeoutError.__module__ = "playwright._impl._errors"
+
+
+def _write_pages(tmp_path: Path, count: int) -> list[Path]:
+    paths = []
+    for index in range(count):
+        path = tmp_path / f"page{index}.html"
+        path.write_text(f"<html><body>{index}</body></html>", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def test_renderer_reuses_browser_across_render_many_calls(tmp_path: Path, monkeypatch) -> None:
+    fake = FakePlaywright()
+    monkeypatch.setattr(rendering, "async_playwright", lambda: fake)
+    paths = _write_pages(tmp_path, 3)
+    config = RenderConfig(max_concurrency=2, max_scroll_iterations=0, post_render_delay=0.0)
+
+    async def run() -> tuple[list, list]:
+        async with PageRenderer(config) as renderer:
+            first = await renderer.render_many(paths[:2])
+            second = await renderer.render_many(paths)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert [page.source_path for page in first] == paths[:2]
+    assert [page.source_path for page in second] == paths
+    assert all(page.render_mode == "playwright" for page in second)
+    assert len(fake.browsers) == 1
+    browser = fake.browsers[0]
+    assert len(browser.contexts) == 2
+    assert browser.closed and fake.stopped
+    assert all(context.closed for context in browser.contexts)
+    assert all(len(context.routes) == 1 for context in browser.contexts)
+    assert all(context.options == {"service_workers": "block"} for context in browser.contexts)
+    assert all(len(context.init_scripts) == 1 for context in browser.contexts)
+    assert all(
+        context.evaluations == [rendering._AUTO_EXPAND_CALL] * len(context.visited)
+        for context in browser.contexts
+    )
+
+
+def test_contexts_are_recycled_after_pages_per_context(tmp_path: Path, monkeypatch) -> None:
+    fake = FakePlaywright()
+    monkeypatch.setattr(rendering, "async_playwright", lambda: fake)
+    paths = _write_pages(tmp_path, 5)
+    config = RenderConfig(
+        max_concurrency=1,
+        max_scroll_iterations=0,
+        post_render_delay=0.0,
+        pages_per_context=2,
+    )
+
+    pages = asyncio.run(rendering.render_paths(paths, config))
+
+    assert len(pages) == 5
+    contexts = fake.browsers[0].contexts
+    assert [len(context.visited) for context in contexts] == [2, 2, 1]
+    assert all(not context.load_states for context in contexts)
+    assert all(context.closed for context in contexts)
+
+
+@pytest.mark.parametrize("plain_read_processes", [False, True])
+def test_plain_fallback_reads_files_concurrently_in_input_order(
+    tmp_path: Path, monkeypatch, plain_read_processes: bool
+) -> None:
+    monkeypatch.setattr(rendering, "async_playwright", None)
+    paths = _write_pages(tmp_path, 6)
+    events: list[tuple[int, int]] = []
+
+    pages = asyncio.run(
+        rendering.render_paths(
+            paths,
+            RenderConfig(max_concurrency=3, plain_read_processes=plain_read_processes),
+            progress=lambda current, total, _path: events.append((current, total)),
+        )
+    )
+
+    assert [page.source_path for page in pages] == paths
+    assert [page.final_html for page in pages] == [
+        f"<html><body>{index}</body></html>" for index in range(6)
+    ]
+    assert all(page.fallback_reason == "playwright_unavailable" for page in pages)
+    assert events == [(index, 6) for index in range(1, 7)]
+
+
+@pytest.mark.parametrize(
+    ("data", "expected"),
+    [
+        ("\ufeff<p>日本語</p>".encode("utf-8"), "<p>日本語</p>"),
+        (
+            '<meta charset="shift_jis"><p>日本語のページ</p>'.encode("shift_jis"),
+            '<meta charset="shift_jis"><p>日本語のページ</p>',
+        ),
+        (b"<p>plain ascii</p>", "<p>plain ascii</p>"),
+        ("<p>日本語</p>".encode("utf-16"), "<p>日本語</p>"),
+        # 偶数バイト長でも、meta で宣言された UTF-16 は UTF-8 として読む
+        (
+            '<meta charset="utf-16"><p>日本語!</p>'.encode("utf-8"),
+            '<meta charset="utf-16"><p>日本語!</p>',
+        ),
+    ],
+)
+def test_read_local_file_sniffs_encoding_before_detection(
+    tmp_path: Path, monkeypatch, data: bytes, expected: str
+) -> None:
+    def fail_detection(_: bytes):
+        raise AssertionError("charset detection should not run")
+
+    monkeypatch.setattr(rendering, "detect_charset", fail_detection)
+    path = tmp_path / "page.html"
+    path.write_bytes(data)
+
+    assert rendering._read_local_file(path) == expected
+
+
+@pytest.mark.parametrize(
+    ("delay", "clicked", "expected_sleeps", "expected_idle_timeouts"),
+    [
+        (0.2, 0, [0.2], []),
+        (0.5, 0, [], [500.0]),
+        (0.5, 2, [0.5], []),
+    ],
+    ids=["shorter_than_idle_window", "network_idle_upper_bound", "expanded_page"],
+)
+def test_post_render_delay_settles_with_sleep_or_network_idle(
+    tmp_path: Path,
+    monkeypatch,
+    delay: float,
+    clicked: int,
+    expected_sleeps: list[float],
+    expected_idle_timeouts: list[float],
+) -> None:
+    fake = FakePlaywright()
+    monkeypatch.setattr(rendering, "async_playwright", lambda: fake)
+    sleeps: list[float] = []
+    idle_timeouts: list[float] = []
+    original_sleep = asyncio.sleep
+
+    async def record_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        await original_sleep(0)
+
+    async def expand(self, script: str, arg=None) -> int:
+        return clicked
+
+    async def idle_timeout(self, state: str, timeout: float) -> None:
+        idle_timeouts.append(timeout)
+        raise SlowTimeoutError("still busy")
+
+    monkeypatch.setattr(rendering.asyncio, "sleep", record_sleep)
+    monkeypatch.setattr(FakePage, "evaluate", expand)
+    monkeypatch.setattr(FakePage, "wait_for_load_state", idle_timeout)
+    config = RenderConfig(max_concurrency=1, max_scroll_iterations=0, post_render_delay=delay)
+
+    pages = asyncio.run(rendering.render_paths(_write_pages(tmp_path, 1), config))
+
+    assert pages[0].render_mode == "playwright"
+    assert sleeps == expected_sleeps
+    assert idle_timeouts == expected_idle_timeouts
+
+
+def test_read_local_file_replaces_invalid_bytes(tmp_path: Path, monkeypatch) -> None:
+    # 判定器がない場合は宣言どおりの文字コードで読み、復号できないバイトだけを置換する
+    monkeypatch.setattr(rendering, "cchardet_detect", None)
+    monkeypatch.setattr(rendering, "detect_charset", None)
+    path = tmp_path / "page.html"
+    path.write_bytes(b'<meta charset="utf-8"><p>ok \xff</p>')
+
+    assert rendering._read_local_file(path) == '<meta charset="utf-8"><p>ok �</p>'
+
+
+def test_read_local_file_recovers_mislabeled_charset_with_detection(tmp_path: Path) -> None:
+    if rendering.cchardet_detect is None and rendering.detect_charset is None:
+        pytest.skip("no charset detector is installed")
+    body = "<p>日本語のテキストです。宣言と実際の文字コードが食い違うページを読み込みます。</p>"
+    path = tmp_path / "page.html"
+    path.write_bytes('<meta charset="utf-8">'.encode("ascii") + body.encode("shift_jis"))
+
+    assert rendering._read_local_file(path) == '<meta charset="utf-8">' + body
+
+
+def test_largest_files_are_rendered_first_but_results_keep_input_order(
+    tmp_path: Path, monkeypatch
+) -> None:
+    fake = FakePlaywright()
+    monkeypatch.setattr(rendering, "async_playwright", lambda: fake)
+    paths = []
+    for name, size in (("small", 10), ("large", 1000), ("medium", 100)):
+        path = tmp_path / f"{name}.html"
+        path.write_text("x" * size, encoding="utf-8")
+        paths.append(path)
+    config = RenderConfig(max_concurrency=1, max_scroll_iterations=0, post_render_delay=0.0)
+
+    pages = asyncio.run(rendering.render_paths(paths, config))
+
+    assert [page.source_path for page in pages] == paths
+    visited = fake.browsers[0].contexts[0].visited
+    assert visited == [paths[1].as_uri(), paths[2].as_uri(), paths[0].as_uri()]
+
+
+def test_context_options_extend_defaults(tmp_path: Path, monkeypatch) -> None:
+    fake = FakePlaywright()
+    monkeypatch.setattr(rendering, "async_playwright", lambda: fake)
+    config = RenderConfig(
+        max_concurrency=1,
+        max_scroll_iterations=0,
+        post_render_delay=0.0,
+        context_options={"bypass_csp": True, "locale": "ja-JP"},
+    )
+
+    asyncio.run(rendering.render_paths(_write_pages(tmp_path, 1), config))
+
+    assert fake.browsers[0].contexts[0].options == {
+        "service_workers": "block",
+        "bypass_csp": True,
+        "locale": "ja-JP",
+    }
+
+
+def test_render_failure_surfaces_the_original_error(tmp_path: Path, monkeypatch) -> None:
+    fake = FakePlaywright()
+    monkeypatch.setattr(rendering, "async_playwright", lambda: fake)
+
+    async def broken_goto(self, url: str, wait_until: str, timeout: float) -> None:
+        raise ValueError("broken page")
+
+    monkeypatch.setattr(FakePage, "goto", broken_goto)
+    config = RenderConfig(max_concurrency=2, max_scroll_iterations=0, post_render_delay=0.0)
+
+    with pytest.raises(ValueError, match="broken page"):
+        asyncio.run(rendering.render_paths(_write_pages(tmp_path, 3), config))
+
+    assert fake.browsers[0].closed
+
+
+def test_auto_expand_is_skipped_when_nothing_is_enabled(tmp_path: Path, monkeypatch) -> None:
+    fake = FakePlaywright()
+    monkeypatch.setattr(rendering, "async_playwright", lambda: fake)
+    config = RenderConfig(
+        max_concurrency=1,
+        max_scroll_iterations=0,
+        auto_expand_candidates=False,
+        expand_texts=(),
+        post_render_delay=0.0,
+    )
+
+    asyncio.run(rendering.render_paths(_write_pages(tmp_path, 2), config))
+
+    context = fake.browsers[0].contexts[0]
+    assert len(context.visited) == 2
+    assert context.evaluations == []
+
+
+@pytest.mark.parametrize("use_cchardet", [False, True])
+def test_read_local_file_detects_undeclared_encoding(
+    tmp_path: Path, monkeypatch, use_cchardet: bool
+) -> None:
+    if use_cchardet and rendering.cchardet_detect is None:
+        pytest.skip("cchardet is not installed")
+    if not use_cchardet:
+        monkeypatch.setattr(rendering, "cchardet_detect", None)
+    text = "<p>日本語のテキストです。文字コードの宣言がないページを読み込みます。</p>"
+    path = tmp_path / "page.html"
+    path.write_bytes(text.encode("shift_jis"))
+
+    assert rendering._read_local_file(path) == text
+
+
+def test_identical_files_in_the_same_directory_are_rendered_once(tmp_path: Path, monkeypatch) -> None:
+    fake = FakePlaywright()
+    monkeypatch.setattr(rendering, "async_playwright", lambda: fake)
+    (tmp_path / "sub").mkdir()
+    paths = []
+    for name, body in (("a", "same"), ("b", "diff"), ("c", "same"), ("sub/a", "same")):
+        path = tmp_path / f"{name}.html"
+        path.write_text(f"<html><body>{body}</body></html>", encoding="utf-8")
+        paths.append(path)
+    events: list[int] = []
+    config = RenderConfig(
+        max_concurrency=1,
+        max_scroll_iterations=0,
+        post_render_delay=0.0,
+        deduplicate_identical_files=True,
+    )
+
+    pages = asyncio.run(
+        rendering.render_paths(paths, config, progress=lambda current, total, _path: events.append(total))
+    )
+
+    visited = fake.browsers[0].contexts[0].visited
+    # 別ディレクトリの同一ファイルは相対参照の解決先が異なるため、個別にレンダリングする
+    assert sorted(visited) == sorted([paths[0].as_uri(), paths[1].as_uri(), paths[3].as_uri()])
+    assert [page.source_path for page in pages] == paths
+    assert pages[2].final_url == paths[2].as_uri()
+    assert pages[2].final_html == pages[0].final_html
+    assert pages[2].render_mode == "playwright"
+    assert events == [4, 4, 4, 4]